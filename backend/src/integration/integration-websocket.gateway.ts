@@ -197,6 +197,28 @@ export class IntegrationWebSocketGateway
     return { status: 'propagated', insightId: data.insight.id };
   }
 
+  /**
+   * Handle coalesced events from Python integration clients
+   */
+  @SubscribeMessage('batch')
+  handleBatch(
+    @MessageBody() batch: [string, any][],
+    @ConnectedSocket() client: Socket,
+  ) {
+    let failed = 0;
+    for (const [event, data] of batch) {
+      // Isolate each event so one bad entry does not drop the rest of the batch
+      try {
+        this.dispatchBatchedEvent(event, data, client);
+      } catch (error) {
+        failed++;
+        this.logger.error(`Failed to handle batched event ${event}:`, error);
+      }
+    }
+
+    return { status: 'processed', count: batch.length, failed };
+  }
+
   /**
    * Handle metrics request
    */
@@ -242,6 +264,40 @@ export class IntegrationWebSocketGateway
     });
   }
 
+  /**
+   * Route one event from a batch to its regular handler
+   */
+  private dispatchBatchedEvent(event: string, data: any, client: Socket): void {
+    switch (event) {
+      case 'register_service':
+        this.handleServiceRegistration(data, client);
+        break;
+      case 'broadcast_game_data':
+        this.handleGameDataBroadcast(data);
+        break;
+      case 'share_pattern':
+        this.handlePatternSharing(data);
+        break;
+      case 'notify_model_update':
+        this.handleModelUpdate(data);
+        break;
+      case 'analyze_move_realtime':
+        void this.handleRealtimeMoveAnalysis(data);
+        break;
+      case 'simulation_result':
+        this.handleSimulationResult(data);
+        break;
+      case 'propagate_insight':
+        this.handleInsightPropagation(data);
+        break;
+      case 'request_metrics':
+        this.handleMetricsRequest(client);
+        break;
+      default:
+        this.logger.debug(`Ignoring unhandled batched event: ${event}`);
+    }
+  }
+
   /**
    * Emit to specific service
    */
@@ -1,11 +1,19 @@
 import sys
 import os
+import asyncio
 import logging
-from typing import List, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
 from fastapi import FastAPI, Request, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+import numpy as np
 import torch
 
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
 # -----------------------------------------------------------------------------
 # Logging setup
 # -----------------------------------------------------------------------------
@@ -100,11 +108,27 @@ logger.info(f"Using device: {device}")
 # -----------------------------------------------------------------------------
 # Enterprise Model Loading with Graceful Fallback
 # -----------------------------------------------------------------------------
-model = Connect4PolicyNet().to(device)
+def load_torchscript_model(ts_path: str):
+    """Load the TorchScript export if one exists, else None (eager fallback)."""
+    if not Path(ts_path).exists():
+        return None
+    try:
+        ts_model = torch.jit.load(ts_path, map_location=device).eval()
+        logger.info(f"⚡ Loaded TorchScript model from {ts_path}")
+        return ts_model
+    except Exception:
+        logger.exception(f"❌ Failed to load TorchScript model from {ts_path}")
+        return None
+
+
+scripted_model = load_torchscript_model(paths["ts_model"])
+model = scripted_model if scripted_model is not None else Connect4PolicyNet().to(device)
 
 # Enhanced model loading with enterprise features
 try:
-    if paths["policy_exists"]:
+    if scripted_model is not None:
+        logger.info("⚡ Serving TorchScript model, skipping eager checkpoint load")
+    elif paths["policy_exists"]:
         checkpoint = torch.load(paths["ckpt"], map_location=device)
         state = checkpoint.get("model_state_dict", checkpoint)
         model.load_state_dict(state)
@@ -126,11 +150,17 @@ try:
         logger.warning("🎲 Initializing with random weights for demo purposes")
         model.eval()
 
-    # Enterprise model validation
+    # NHWC lets cuDNN pick its faster channels-last conv kernels
+    if device.type == "cuda":
+        model = model.to(memory_format=torch.channels_last)
+
+    # Enterprise model validation; the forwards double as warmup so the
+    # first real request doesn't pay TorchScript's profiling/fusion passes
     logger.info("🔍 Running enterprise model validation...")
     test_input = torch.zeros(1, 2, 6, 7, device=device)
-    with torch.no_grad():
-        test_output = model(test_input)
+    with torch.inference_mode():
+        for _ in range(2):
+            test_output = model(test_input)
         if test_output.shape != (1, 7):
             raise RuntimeError(
                 f"Invalid model output shape: {test_output.shape}, expected (1, 7)"
@@ -146,11 +176,136 @@ except Exception as e:
         "⚠️  Service running with fallback model - update models for full functionality"
     )
 
+# -----------------------------------------------------------------------------
+# ONNX Runtime session for CPU inference
+# -----------------------------------------------------------------------------
+def load_onnx_session(onnx_path: str):
+    """Create an optimized ORT CPU session, or None to keep using PyTorch."""
+    if device.type != "cpu" or ort is None or not Path(onnx_path).exists():
+        return None
+    try:
+        sess_opts = ort.SessionOptions()
+        sess_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_opts.intra_op_num_threads = int(os.getenv("ORT_INTRA_OP_THREADS", "1"))
+        sess_opts.inter_op_num_threads = int(os.getenv("ORT_INTER_OP_THREADS", "1"))
+        session = ort.InferenceSession(
+            onnx_path, sess_options=sess_opts, providers=["CPUExecutionProvider"]
+        )
+        # Batched /predict needs a dynamic batch axis; this doubles as warmup
+        input_name = session.get_inputs()[0].name
+        test_output = session.run(
+            None, {input_name: np.zeros((2, 2, 6, 7), dtype=np.float32)}
+        )[0]
+        if test_output.shape != (2, 7):
+            raise RuntimeError(f"Invalid ONNX output shape: {test_output.shape}")
+        logger.info(f"⚡ Using ONNX Runtime CPU session from {onnx_path}")
+        return session
+    except Exception:
+        logger.exception(f"❌ ONNX Runtime session unavailable for {onnx_path}")
+        return None
+
+
+onnx_session = load_onnx_session(paths["onnx_model"])
+onnx_input_name = onnx_session.get_inputs()[0].name if onnx_session else None
+
 # -----------------------------------------------------------------------------
 # FastAPI app
 # -----------------------------------------------------------------------------
 app = FastAPI(title="Connect4 AI Prediction Service")
 
+# -----------------------------------------------------------------------------
+# Request micro-batching
+# -----------------------------------------------------------------------------
+# Concurrent /predict calls are coalesced into a single forward pass
+MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "32"))
+BATCH_WINDOW_S = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "2")) / 1000.0
+
+# Queue entries: (CPU board tensor, result future, whether probs are wanted)
+_batch_queue: Optional[
+    "asyncio.Queue[Tuple[torch.Tensor, asyncio.Future, bool]]"
+] = None
+
+# bf16 autocast for CUDA forwards; turned off if it ever yields non-finite logits
+use_amp = device.type == "cuda" and os.getenv("PREDICT_AMP", "1") == "1"
+
+
+# Forwards run on one worker thread so the event loop keeps accepting requests
+# and assembling the next batch while the current one executes
+_forward_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+
+
+def _forward(batch: torch.Tensor) -> torch.Tensor:
+    """Run the model on a CPU batch and return float32 logits on the CPU."""
+    global use_amp
+    if onnx_session is not None:
+        return torch.from_numpy(
+            onnx_session.run(None, {onnx_input_name: batch.numpy()})[0]
+        )
+    if device.type == "cuda":
+        batch = batch.pin_memory().to(
+            device, non_blocking=True, memory_format=torch.channels_last
+        )
+    with torch.inference_mode():
+        if use_amp:
+            with torch.autocast(device_type="cuda", dtype=torch.bfloat16):
+                logits = model(batch).float().cpu()
+            if torch.isfinite(logits).all():
+                return logits
+            logger.warning("⚠️  Non-finite logits under bf16 autocast, using FP32")
+            use_amp = False
+        return model(batch).float().cpu()
+
+
+async def _batcher():
+    """Drain queued board tensors and run them through the model together."""
+    while True:
+        batch = [await _batch_queue.get()]
+        if BATCH_WINDOW_S > 0:
+            await asyncio.sleep(BATCH_WINDOW_S)
+        try:
+            while len(batch) < MAX_BATCH_SIZE:
+                batch.append(_batch_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            pass
+
+        try:
+            # Single device->host copy; argmax on logits matches softmax
+            logits = await asyncio.get_running_loop().run_in_executor(
+                _forward_executor, _forward, torch.cat([t for t, _, _ in batch], dim=0)
+            )
+            moves = torch.argmax(logits, dim=1).tolist()
+            # Softmax only when some caller asked for the distribution
+            if any(wants_probs for _, _, wants_probs in batch):
+                probs = torch.softmax(logits, dim=1).tolist()
+            else:
+                probs = [None] * len(batch)
+        except Exception as e:
+            for _, fut, _ in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            continue
+
+        for (_, fut, wants_probs), move, row in zip(batch, moves, probs):
+            if not fut.done():
+                fut.set_result((move, row if wants_probs else None))
+
+
+@app.on_event("startup")
+async def start_batcher():
+    global _batch_queue
+    _batch_queue = asyncio.Queue()
+    asyncio.create_task(_batcher())
+    logger.info(
+        f"Prediction batcher started (max batch {MAX_BATCH_SIZE}, "
+        f"window {BATCH_WINDOW_S * 1000:.1f} ms)"
+    )
+
+
+# String board cell -> index into CELL_TO_PLANES (unknown cells read as Empty)
+CELL_INDEX = {"Empty": 0, "Red": 1, "Yellow": 2}
+# Rows: Empty / Red / Yellow; columns: (Red plane, Yellow plane)
+CELL_TO_PLANES = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
 
 # Pydantic model for request
 # Accept either 6×7 string boards or 2×6×7 numeric boards
@@ -169,9 +324,27 @@ async def log_requests(request: Request, call_next):
     return response
 
 
-@app.post("/predict")
-def predict(payload: BoardIn):
-    """Predict the best Connect4 move for a given board."""
+@app.post(
+    "/predict",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": BoardIn.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
+async def predict(request: Request, with_probs: bool = True):
+    """Predict the best Connect4 move for a given board.
+
+    Pass ``?with_probs=false`` to skip the softmax and return only the move.
+    """
+    # Parse and validate the raw body in one pydantic-core pass
+    try:
+        payload = BoardIn.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422, detail=e.errors(include_url=False, include_input=False)
+        )
     b = payload.board
     # Numeric mask format: shape [2][6][7]
     if (
@@ -184,7 +357,7 @@ def predict(payload: BoardIn):
         )
         and len(b) == 2
     ):
-        tensor = torch.tensor(b, dtype=torch.float32, device=device).unsqueeze(0)
+        tensor = torch.tensor(b, dtype=torch.float32).unsqueeze(0)
         logger.debug(f"Received numeric board tensor shape: {tensor.shape}")
     # String-based board format: shape [6][7]
     elif (
@@ -192,13 +365,13 @@ def predict(payload: BoardIn):
         and len(b) == 6
         and all(isinstance(row, list) and len(row) == 7 for row in b)
     ):
-        mapping = {"Empty": 0.0, "Red": 1.0, "Yellow": -1.0}
-        numeric = [[mapping.get(cell, 0.0) for cell in row] for row in b]
-        red_mask = [[1.0 if v == 1.0 else 0.0 for v in row] for row in numeric]
-        yellow_mask = [[1.0 if v == -1.0 else 0.0 for v in row] for row in numeric]
-        tensor = torch.tensor(
-            [red_mask, yellow_mask], dtype=torch.float32, device=device
-        ).unsqueeze(0)
+        idx = np.fromiter(
+            (CELL_INDEX.get(cell, 0) for row in b for cell in row),
+            dtype=np.int8,
+            count=42,
+        ).reshape(6, 7)
+        planes = np.ascontiguousarray(CELL_TO_PLANES[idx].transpose(2, 0, 1))
+        tensor = torch.from_numpy(planes).unsqueeze(0)
         logger.debug(f"Converted string board to tensor shape: {tensor.shape}")
     else:
         logger.error(f"Invalid board format: {b}")
@@ -208,10 +381,12 @@ def predict(payload: BoardIn):
 
     # Inference
     try:
-        with torch.no_grad():
-            logits = model(tensor)
-            probs = torch.softmax(logits, dim=1)[0].cpu().tolist()
-            move = int(torch.argmax(torch.tensor(probs)).item())
+        fut = asyncio.get_running_loop().create_future()
+        await _batch_queue.put((tensor, fut, with_probs))
+        move, probs = await fut
+        if probs is None:
+            logger.info(f"Predicted move: {move}")
+            return {"move": move}
         logger.info(f"Predicted move: {move} with probs: {probs}")
         return {"move": move, "probs": probs}
     except Exception as e:
@@ -221,4 +396,4 @@ def predict(payload: BoardIn):
 
 # Usage:
 # cd backend/src/ml
-# uvicorn ml_service:app --reload --host 0.0.0.0 --port 8000
+# uvicorn ml_service:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools
@@ -1,6 +1,5 @@
 import argparse
 import json
-import random
 import sys
 from pathlib import Path
 
@@ -14,59 +13,88 @@ CODE_TO_STR = {0: 'Empty', 1: 'Red', -1: 'Yellow'}
 
 
 def init_board():
-    return [[0 for _ in range(COLS)] for _ in range(ROWS)]
+    return np.zeros((ROWS, COLS), dtype=np.int8)
 
 
 def get_legal_moves(board):
-    return [c for c in range(COLS) if board[0][c] == 0]
+    return np.flatnonzero(board[0] == 0).tolist()
 
 
 def drop_piece(board, col, player):
-    for r in range(ROWS-1, -1, -1):
-        if board[r][col] == 0:
-            board[r][col] = player
-            return
-    raise ValueError(f"Column {col} is full")
+    empty = np.flatnonzero(board[:, col] == 0)
+    if empty.size == 0:
+        raise ValueError(f"Column {col} is full")
+    board[empty[-1], col] = player
 
 
 def check_winner(board):
     # returns 1 if Red wins, -1 if Yellow wins, 0 otherwise
-    # horizontal, vertical, diag ↘ and ↗
-    for r in range(ROWS):
-        for c in range(COLS - WIN_LEN + 1):
-            s = sum(board[r][c+i] for i in range(WIN_LEN))
-            if abs(s) == WIN_LEN:
-                return int(np.sign(s))
-    for c in range(COLS):
-        for r in range(ROWS - WIN_LEN + 1):
-            s = sum(board[r+i][c] for i in range(WIN_LEN))
-            if abs(s) == WIN_LEN:
-                return int(np.sign(s))
-    for r in range(ROWS - WIN_LEN + 1):
-        for c in range(COLS - WIN_LEN + 1):
-            s = sum(board[r+i][c+i] for i in range(WIN_LEN))
-            if abs(s) == WIN_LEN:
-                return int(np.sign(s))
-    for r in range(WIN_LEN - 1, ROWS):
-        for c in range(COLS - WIN_LEN + 1):
-            s = sum(board[r-i][c+i] for i in range(WIN_LEN))
-            if abs(s) == WIN_LEN:
-                return int(np.sign(s))
+    # sum every length-4 window at once: horizontal, vertical, diag ↘ and ↗
+    b = board
+    n = WIN_LEN
+    windows = (
+        sum(b[:, i:COLS - n + 1 + i] for i in range(n)),
+        sum(b[i:ROWS - n + 1 + i, :] for i in range(n)),
+        sum(b[i:ROWS - n + 1 + i, i:COLS - n + 1 + i] for i in range(n)),
+        sum(b[n - 1 - i:ROWS - i, i:COLS - n + 1 + i] for i in range(n)),
+    )
+    for s in windows:
+        if (s == n).any():
+            return 1
+        if (s == -n).any():
+            return -1
     return 0
 
 
 def encode_for_model(board, player):
     # encode from `player` perspective: 1 for player, 0 empty, -1 opponent
-    flat = []
-    for row in board:
-        for cell in row:
-            if cell == player:
-                flat.append(1.0)
-            elif cell == 0:
-                flat.append(0.0)
-            else:
-                flat.append(-1.0)
-    return np.array(flat, dtype=np.float32)
+    # accepts a single (6, 7) board or a (G, 6, 7) stack of boards
+    flat = board.reshape(*board.shape[:-2], ROWS * COLS)
+    return (flat * player).astype(np.float32)
+
+
+def play_games(model, n_games):
+    """Play n_games in lockstep with one batched policy forward per ply."""
+    boards = np.zeros((n_games, ROWS, COLS), dtype=np.int8)
+    winners = np.zeros(n_games, dtype=np.int8)
+    done = np.zeros(n_games, dtype=bool)
+    histories: list[list[tuple[np.ndarray, int, int]]] = [[] for _ in range(n_games)]
+    player = 1  # 1=Red starts, -1=Yellow; every live game is on the same ply
+
+    while not done.all():
+        active = np.flatnonzero(~done)
+        legal = boards[active, 0, :] == 0
+        # full boards end as draws
+        full = ~legal.any(axis=1)
+        done[active[full]] = True
+        active, legal = active[~full], legal[~full]
+        if active.size == 0:
+            break
+
+        # Choose actions for every live game at once
+        if model:
+            probs = model.predict(encode_for_model(boards[active], player), verbose=0)
+            # mask illegal
+            probs = probs * legal
+            dead = probs.sum(axis=1) == 0
+            probs[dead] = legal[dead]
+        else:
+            probs = legal.astype(np.float32)
+        cdf = probs.cumsum(axis=1)
+        u = np.random.rand(len(active)) * cdf[:, -1]
+        actions = (cdf > u[:, None]).argmax(axis=1)
+
+        for g, action in zip(active, actions.tolist()):
+            # Record state and move, then apply it
+            histories[g].append((boards[g].copy(), player, action))
+            drop_piece(boards[g], action, player)
+            winner = check_winner(boards[g])
+            if winner != 0:
+                winners[g] = winner
+                done[g] = True
+        player = -player
+
+    return histories, winners.tolist()
 
 
 # --- Main script ---
@@ -77,6 +105,8 @@ def main():
                         help='Number of self-play games to generate')
     parser.add_argument('--model', type=Path,
                         help='Path to a Keras .h5 policy model (optional)')
+    parser.add_argument('--parallel', type=int, default=256,
+                        help='Number of games played in lockstep per batch')
     args = parser.parse_args()
 
     # Load model if provided
@@ -88,57 +118,25 @@ def main():
         model = tf.keras.models.load_model(str(args.model))
 
     data: list[dict] = []
-    for ep in range(1, args.episodes + 1):
-        board = init_board()
-        player = 1  # 1=Red starts, -1=Yellow
-        history: list[tuple[list[list[int]], int, int]] = []
-
-        # Play one game
-        while True:
-            legal = get_legal_moves(board)
-            if not legal:
-                winner = 0
-                break
-
-            # Choose action
-            if model:
-                inp = encode_for_model(board, player)[None, :]
-                probs = model.predict(inp, verbose=0)[0]
-                # mask illegal
-                mask = np.zeros_like(probs)
-                mask[legal] = 1
-                probs *= mask
-                if probs.sum() == 0:
-                    probs[legal] = 1.0
-                probs /= probs.sum()
-                action = int(np.random.choice(COLS, p=probs))
-            else:
-                action = random.choice(legal)
-
-            # Record state and move
-            history.append(([row.copy() for row in board], player, action))
-
-            # Apply move
-            drop_piece(board, action, player)
-            winner = check_winner(board)
-            if winner != 0:
-                break
-            player = -player
+    for start in range(0, args.episodes, args.parallel):
+        n_games = min(args.parallel, args.episodes - start)
+        histories, winners = play_games(model, n_games)
 
         # Compile examples
-        outcome_label = 'draw' if winner == 0 else ('win' if winner == 1 else 'loss')
-        for state, mover, move in history:
-            # Convert numeric board to string labels
-            board_str = [[CODE_TO_STR[cell] for cell in row] for row in state]
-            # Determine outcome from mover's POV
-            if winner == 0:
-                res = 'draw'
-            else:
-                res = 'win' if mover == winner else 'loss'
-            data.append({'board': board_str, 'move': move, 'outcome': res})
-
-        if ep % 1000 == 0:
-            print(f"Generated {ep} games...")
+        for history, winner in zip(histories, winners):
+            for state, mover, move in history:
+                # Convert numeric board to string labels
+                board_str = [[CODE_TO_STR[cell] for cell in row] for row in state.tolist()]
+                # Determine outcome from mover's POV
+                if winner == 0:
+                    res = 'draw'
+                else:
+                    res = 'win' if mover == winner else 'loss'
+                data.append({'board': board_str, 'move': move, 'outcome': res})
+
+        played = start + n_games
+        if played // 1000 > start // 1000:
+            print(f"Generated {played} games...")
 
     # Write to file
     out_dir = Path(__file__).resolve().parent.parent / 'data'
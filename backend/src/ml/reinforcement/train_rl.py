@@ -10,58 +10,42 @@ WIN_LENGTH = 4
 
 
 def init_board():
-    return [[0 for _ in range(COLS)] for _ in range(ROWS)]
+    return np.zeros((ROWS, COLS), dtype=np.int8)
 
 
 def get_legal_moves(board):
-    return [c for c in range(COLS) if board[0][c] == 0]
+    return np.flatnonzero(board[0] == 0).tolist()
 
 
 def drop_piece(board, col, player):
-    for r in range(ROWS-1, -1, -1):
-        if board[r][col] == 0:
-            board[r][col] = player
-            return
-    raise ValueError(f"Column {col} is full")
+    empty = np.flatnonzero(board[:, col] == 0)
+    if empty.size == 0:
+        raise ValueError(f"Column {col} is full")
+    board[empty[-1], col] = player
 
 
 def check_winner(board):
-    # horizontal, vertical, diagonal ↘ ↗
-    lines = []
-    # horizontal
-    for r in range(ROWS):
-        for c in range(COLS - WIN_LENGTH + 1):
-            lines.append([board[r][c+i] for i in range(WIN_LENGTH)])
-    # vertical
-    for c in range(COLS):
-        for r in range(ROWS - WIN_LENGTH + 1):
-            lines.append([board[r+i][c] for i in range(WIN_LENGTH)])
-    # diag ↘
-    for r in range(ROWS - WIN_LENGTH + 1):
-        for c in range(COLS - WIN_LENGTH + 1):
-            lines.append([board[r+i][c+i] for i in range(WIN_LENGTH)])
-    # diag ↗
-    for r in range(WIN_LENGTH-1, ROWS):
-        for c in range(COLS - WIN_LENGTH + 1):
-            lines.append([board[r-i][c+i] for i in range(WIN_LENGTH)])
-    for line in lines:
-        if abs(sum(line)) == WIN_LENGTH:
-            return int(np.sign(sum(line)))
+    # returns 1 if Red wins, -1 if Yellow wins, 0 otherwise
+    # sum every length-4 window at once: horizontal, vertical, diag ↘ and ↗
+    b = board
+    n = WIN_LENGTH
+    windows = (
+        sum(b[:, i:COLS - n + 1 + i] for i in range(n)),
+        sum(b[i:ROWS - n + 1 + i, :] for i in range(n)),
+        sum(b[i:ROWS - n + 1 + i, i:COLS - n + 1 + i] for i in range(n)),
+        sum(b[n - 1 - i:ROWS - i, i:COLS - n + 1 + i] for i in range(n)),
+    )
+    for s in windows:
+        if (s == n).any():
+            return 1
+        if (s == -n).any():
+            return -1
     return 0
 
 
 def encode_board(board, player):
     # encode from perspective of `player`: 1 for player, -1 for opponent, 0 empty
-    flat = []
-    for row in board:
-        for cell in row:
-            if cell == player:
-                flat.append(1.0)
-            elif cell == 0:
-                flat.append(0.0)
-            else:
-                flat.append(-1.0)
-    return np.array(flat, dtype=np.float32)
+    return (board * player).astype(np.float32).ravel()
 
 
 def build_model(lr):
@@ -1,8 +1,14 @@
 import json
 import random
+import numpy as np
 import sys 
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib parser
+    orjson = None
+
 # --- Configuration ---
 # Locate data directory relative to this script
 BASE_DIR = Path(__file__).resolve().parent.parent / 'data'
@@ -26,6 +32,9 @@ def load_raw_examples(path):
     if not path.exists():
         print(f"Error: raw_games.json not found at {path}", file=sys.stderr)
         sys.exit(1)
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
     with open(path, 'r') as f:
         return json.load(f)
     
@@ -45,8 +54,20 @@ def split_dataset(dataset, train_frac=0.8):
     return dataset[:split_idx], dataset[split_idx:]
 
 def write_json(path, data):
-    with open(path, 'w') as f:
-        json.dump(data, f)
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f)
+    print(f"Wrote {len(data)} examples to {path}")
+
+def write_columnar(path, data):
+    """Save examples as flat int8 column arrays (features (N, 42), label, value)"""
+    features = np.array([ex['features'] for ex in data], dtype=np.int8).reshape(-1, 42)
+    labels = np.array([ex['label'] for ex in data], dtype=np.int8)
+    values = np.array([ex['value'] for ex in data], dtype=np.int8)
+    np.savez(path, features=features, labels=labels, values=values)
     print(f"Wrote {len(data)} examples to {path}")
     
 def main():
@@ -59,6 +80,8 @@ def main():
     
     write_json(TRAIN_FILE, train)
     write_json(TEST_FILE, test)
+    write_columnar(TRAIN_FILE.with_suffix('.npz'), train)
+    write_columnar(TEST_FILE.with_suffix('.npz'), test)
     
     print("Preprocessing complete.")
     
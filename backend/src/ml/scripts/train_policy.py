@@ -1,12 +1,23 @@
 import argparse
 import json
+import os
 import sys
 import logging
 from pathlib import Path
 import numpy as np
-import torch
-import torch.nn as nn
-from torch.utils.data import TensorDataset, DataLoader
+
+# Let the CUDA caching allocator grow segments in place instead of fragmenting
+# across epochs; must be set before torch initializes CUDA
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
+import torch  # noqa: E402
+import torch.nn as nn  # noqa: E402
+from torch.utils.data import TensorDataset, DataLoader  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Setup detailed logging
 logging.basicConfig(
@@ -39,6 +50,9 @@ def find_file(filename: str) -> Path:
 
 def load_json(path: Path):
     try:
+        if orjson is not None:
+            # One bytes read + C parser; much faster on large datasets
+            return orjson.loads(path.read_bytes())
         with open(path, "r") as f:
             return json.load(f)
     except Exception:
@@ -46,28 +60,131 @@ def load_json(path: Path):
         raise
 
 
-def convert_feature(feat_list):
-    arr = np.array(feat_list, dtype=np.int64).reshape(6, 7)
-    red = (arr == 1).astype(np.float32)
-    yellow = (arr == 2).astype(np.float32)
-    return torch.from_numpy(np.stack([red, yellow], axis=0))
+def codes_to_planes(codes: torch.Tensor) -> torch.Tensor:
+    """Expand (B, 6, 7) int8 cell codes into (B, 2, 6, 7) Red/Yellow float planes"""
+    return torch.stack([codes == 1, codes == 2], dim=1).float()
+
+
+def compact_dataset(feats: np.ndarray, labels: torch.Tensor) -> TensorDataset:
+    """Keep boards as (N, 6, 7) int8 codes; planes are built per batch on device"""
+    codes = torch.from_numpy(np.ascontiguousarray(feats).reshape(-1, 6, 7))
+    return TensorDataset(codes, labels)
 
 
 def prepare_dataset(json_path: Path):
-    examples = load_json(json_path)
-    data_list, label_list = [], []
-    for ex in examples:
-        feat = ex.get("features")
-        label = ex.get("label")
-        if feat is None or label is None:
-            continue
-        data_list.append(convert_feature(feat))
-        label_list.append(int(label))
-    if not data_list:
-        raise RuntimeError(f"No valid examples found in {json_path}")
-    data = torch.stack(data_list)
-    labels = torch.tensor(label_list, dtype=torch.long)
-    return TensorDataset(data, labels)
+    if json_path.suffix == ".npz":
+        return load_columnar(json_path)
+
+    # Parsed features are cached next to the JSON, keyed by its size and mtime
+    cache_path = json_path.with_name(json_path.name + ".cache.pt")
+    stat = json_path.stat()
+    source_key = (stat.st_size, stat.st_mtime_ns)
+    feats, labels = load_cache(cache_path, source_key)
+    if feats is None:
+        examples = load_json(json_path)
+        valid = [
+            ex
+            for ex in examples
+            if ex.get("features") is not None and ex.get("label") is not None
+        ]
+        if not valid:
+            raise RuntimeError(f"No valid examples found in {json_path}")
+        feats = np.array([ex["features"] for ex in valid], dtype=np.int8)
+        labels = torch.tensor([int(ex["label"]) for ex in valid], dtype=torch.long)
+        save_cache(cache_path, source_key, feats, labels)
+    return compact_dataset(feats, labels)
+
+
+def load_cache(cache_path: Path, source_key):
+    """Return cached (features, labels) if built from the same source, else Nones"""
+    if not cache_path.is_file():
+        return None, None
+    try:
+        cached = torch.load(cache_path)
+    except Exception:
+        logger.warning(f"Ignoring unreadable dataset cache {cache_path}")
+        return None, None
+    if cached.get("source_key") != source_key:
+        return None, None
+    logger.info(f"Loaded preprocessed examples from cache {cache_path}")
+    return cached["features"].numpy(), cached["labels"]
+
+
+def save_cache(cache_path: Path, source_key, feats: np.ndarray, labels: torch.Tensor):
+    """Persist parsed int8 features and labels so later runs skip the JSON"""
+    try:
+        torch.save(
+            {
+                "source_key": source_key,
+                "features": torch.from_numpy(feats),
+                "labels": labels,
+            },
+            cache_path,
+        )
+    except OSError:
+        logger.warning(f"Could not write dataset cache {cache_path}")
+
+
+def load_columnar(path: Path):
+    """Load a preprocess.py .npz dataset (int8 features/labels columns)"""
+    try:
+        with np.load(path) as cols:
+            feats, labels = cols["features"], cols["labels"]
+    except Exception:
+        logger.exception(f"Failed to load columnar dataset from {path}")
+        raise
+    if len(labels) == 0:
+        raise RuntimeError(f"No examples found in {path}")
+    return compact_dataset(feats, torch.from_numpy(labels.astype(np.int64)))
+
+
+def loader_kwargs(num_workers: int, device: torch.device) -> dict:
+    """DataLoader options that overlap batch collation with GPU compute"""
+    kwargs = {"num_workers": num_workers, "pin_memory": device.type == "cuda"}
+    if num_workers > 0:
+        kwargs.update(persistent_workers=True, prefetch_factor=4)
+    return kwargs
+
+
+def memory_format_for(device: torch.device) -> torch.memory_format:
+    """NHWC on CUDA, where cuDNN has faster channels-last conv kernels"""
+    return torch.channels_last if device.type == "cuda" else torch.contiguous_format
+
+
+def to_model_input(x: torch.Tensor, device: torch.device) -> torch.Tensor:
+    """Copy a batch to the device, expanding int8 cell codes into planes there"""
+    x = x.to(device, non_blocking=True)
+    if x.dtype == torch.int8:
+        x = codes_to_planes(x)
+    return x.contiguous(memory_format=memory_format_for(device))
+
+
+def next_batch(it, device):
+    """Pull the next (x, y) from a loader iterator and start its async device copy"""
+    try:
+        x, y = next(it)
+    except StopIteration:
+        return None, None
+    return to_model_input(x, device), y.to(device, non_blocking=True)
+
+
+def compile_model(model, sample: torch.Tensor):
+    """torch.compile the net, falling back from CUDA graphs to default mode to eager"""
+    modes = ["reduce-overhead", "default"] if sample.is_cuda else ["default"]
+    # The warm-up forward updates BatchNorm running stats; put them back after
+    state = {k: v.clone() for k, v in model.state_dict().items()}
+    for mode in modes:
+        try:
+            compiled = torch.compile(model, mode=mode, fullgraph=True)
+            compiled(sample)  # compilation is lazy; surface failures here
+            logger.info(f"Compiled policy net with mode={mode}")
+            return compiled
+        except Exception:
+            logger.warning(f"torch.compile(mode={mode}) failed", exc_info=True)
+        finally:
+            model.load_state_dict(state)
+    logger.warning("Training the policy net eagerly")
+    return model
 
 
 def evaluate(model, loader, device):
@@ -75,7 +192,8 @@ def evaluate(model, loader, device):
     correct, total = 0, 0
     with torch.no_grad():
         for x, y in loader:
-            x, y = x.to(device), y.to(device)
+            x = to_model_input(x, device)
+            y = y.to(device, non_blocking=True)
             logits = model(x)
             preds = logits.argmax(dim=1)
             correct += (preds == y).sum().item()
@@ -94,24 +212,42 @@ Examples:
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument(
-        "--train-json", type=Path, required=True, help="Path to train.json file"
+        "--train-json",
+        type=Path,
+        required=True,
+        help="Path to train.json (or the columnar train.npz from preprocess.py)",
     )
     parser.add_argument(
         "--test-data",
         type=Path,
-        help="Path to test_data.pt or .json file for evaluation",
+        help="Path to test_data.pt, .json or .npz file for evaluation",
     )
     parser.add_argument(
         "--epochs", type=int, default=10, help="Number of training epochs"
     )
     parser.add_argument("--batch-size", type=int, default=64, help="Batch size")
     parser.add_argument("--lr", type=float, default=1e-3, help="Learning rate")
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="DataLoader worker processes (0 loads batches in the main process)",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Train through torch.compile (CUDA graphs on GPU, fused kernels)",
+    )
     args = parser.parse_args()
 
     logger.info(
         f"Starting training: epochs={args.epochs}, batch_size={args.batch_size}, lr={args.lr}"
     )
 
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    logger.info(f"Using device: {device}")
+    dl_kwargs = loader_kwargs(args.num_workers, device)
+
     # Load training data
     try:
         logger.info(f"Loading training data from {args.train_json}")
@@ -119,7 +255,14 @@ Examples:
     except Exception:
         logger.error("Aborting due to training data load failure.")
         sys.exit(1)
-    train_loader = DataLoader(train_ds, batch_size=args.batch_size, shuffle=True)
+    # Compiled graphs are specialised on the batch shape, so drop the ragged tail
+    train_loader = DataLoader(
+        train_ds,
+        batch_size=args.batch_size,
+        shuffle=True,
+        drop_last=args.compile and len(train_ds) >= args.batch_size,
+        **dl_kwargs,
+    )
     logger.info(
         f"Loaded {len(train_ds)} training examples, {len(train_loader)} batches per epoch."
     )
@@ -129,21 +272,30 @@ Examples:
     if args.test_data:
         try:
             logger.info(f"Loading test data from {args.test_data}")
-            if args.test_data.suffix == ".json":
+            if args.test_data.suffix in (".json", ".npz"):
                 test_ds = prepare_dataset(args.test_data)
             else:
                 chk = torch.load(args.test_data, map_location="cpu")
                 test_ds = TensorDataset(chk["data"], chk["labels"])
-            test_loader = DataLoader(test_ds, batch_size=args.batch_size)
+            test_loader = DataLoader(test_ds, batch_size=args.batch_size, **dl_kwargs)
             logger.info(f"Loaded {len(test_ds)} test examples.")
         except Exception:
             logger.exception("Failed to load test data, continuing without evaluation.")
 
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    logger.info(f"Using device: {device}")
-    model = Connect4PolicyNet().to(device)
-    optimizer = torch.optim.Adam(model.parameters(), lr=args.lr)
+    model = Connect4PolicyNet().to(device, memory_format=memory_format_for(device))
+    # Checkpoints and exports use the plain module; only training goes compiled
+    train_model = model
+    if args.compile:
+        sample = to_model_input(train_ds[: args.batch_size][0], device)
+        train_model = compile_model(model, sample)
+    optimizer = torch.optim.Adam(
+        model.parameters(), lr=args.lr, fused=device.type == "cuda"
+    )
     criterion = nn.CrossEntropyLoss()
+    # FP16 autocast + loss scaling on CUDA; any FP32 matmuls left may use TF32
+    use_amp = device.type == "cuda"
+    scaler = torch.amp.GradScaler("cuda", enabled=use_amp)
+    torch.set_float32_matmul_precision("high")
 
     models_dir = ML_ROOT / "models"
     models_dir.mkdir(parents=True, exist_ok=True)
@@ -155,23 +307,38 @@ Examples:
     total_batches = len(train_loader)
     for epoch in range(1, args.epochs + 1):
         model.train()
-        running_loss = 0.0
+        running_loss = torch.zeros((), device=device)
+        seen = 0
         logger.info(f"Epoch {epoch}/{args.epochs} start")
-        for idx, (x, y) in enumerate(train_loader, start=1):
+        # Keep one batch in flight: the next host->device copy is queued
+        # before backward so it overlaps with the current step's compute.
+        it = iter(train_loader)
+        nx, ny = next_batch(it, device)
+        idx = 0
+        while nx is not None:
+            idx += 1
+            x, y = nx, ny
+            prefetched = False
             try:
-                x, y = x.to(device), y.to(device)
-                optimizer.zero_grad()
-                logits = model(x)
-                loss = criterion(logits, y)
-                loss.backward()
-                optimizer.step()
-                running_loss += loss.item() * y.size(0)
+                optimizer.zero_grad(set_to_none=True)
+                with torch.autocast("cuda", dtype=torch.float16, enabled=use_amp):
+                    logits = train_model(x)
+                    loss = criterion(logits, y)
+                nx, ny = next_batch(it, device)
+                prefetched = True
+                scaler.scale(loss).backward()
+                scaler.step(optimizer)
+                scaler.update()
+                running_loss += loss.detach() * y.size(0)
+                seen += y.size(0)
             except Exception:
                 logger.exception(f"Error during batch {idx}/{total_batches}")
+            if not prefetched:
+                nx, ny = next_batch(it, device)
             if idx % max(1, total_batches // 10) == 0:
                 pct = idx / total_batches * 100
                 logger.info(f"Epoch {epoch}: {pct:.1f}% complete")
-        avg_loss = running_loss / len(train_ds)
+        avg_loss = running_loss.item() / max(1, seen)
         logger.info(f"Epoch {epoch} complete: Avg Loss={avg_loss:.4f}")
 
         if test_loader:
@@ -185,6 +352,11 @@ Examples:
             torch.save(model.state_dict(), ckpt_path)
             logger.info(f"Checkpoint saved to {ckpt_path}")
 
+        # Release cached blocks once per epoch; per-step calls would stall
+        # the prefetch pipeline and defeat the caching allocator
+        if device.type == "cuda":
+            torch.cuda.empty_cache()
+
     logger.info(f"Training complete. Best test accuracy: {best_acc:.2f}%")
 
     # Export TorchScript
@@ -11,17 +11,16 @@ ML_ROOT = os.path.dirname(__file__)
 sys.path.append(os.path.join(ML_ROOT, "src"))
 from policy_net import Connect4PolicyNet 
 
+# Board cell encoding shared by every example
+CELL_VALUES = {'Empty': 0, 'Red': 1, 'Yellow': -1}
+
 
 def load_dataset(data_path: str):
     """Loads JSON data and returns a TensorDataset of inputs and labels."""
     with open(data_path, 'r') as f:
         raw = json.load(f)
-    boards, moves = [], []
-    for ex in raw:
-        flat = [ {'Empty':0, 'Red':1, 'Yellow':-1}[c]
-                 for row in ex['board'] for c in row ]
-        boards.append(flat)
-        moves.append(ex['move'])
+    boards = [[CELL_VALUES[c] for row in ex['board'] for c in row] for ex in raw]
+    moves = [ex['move'] for ex in raw]
     X = torch.tensor(boards, dtype=torch.float32)
     y = torch.tensor(moves, dtype=torch.long)
     return TensorDataset(X, y)
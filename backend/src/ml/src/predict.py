@@ -21,12 +21,17 @@ def load_board_from_file(path: str) -> list[list[str]]:
 
 
 def build_input_tensor(board: list[list[str]], device: torch.device) -> torch.Tensor:
-    mapping = {'Empty': 0.0, 'Red': 1.0, 'Yellow': -1.0}
-    # Convert to numeric 6x7 floats
-    numeric = [[mapping[cell] for cell in row] for row in board]
-    # Two-channel masks
-    red_mask = [[1.0 if v == 1.0 else 0.0 for v in row] for row in numeric]
-    yellow_mask = [[1.0 if v == -1.0 else 0.0 for v in row] for row in numeric]
+    # Two-channel masks, filled in a single pass over the board
+    red_mask = [[0.0] * 7 for _ in range(6)]
+    yellow_mask = [[0.0] * 7 for _ in range(6)]
+    for r, row in enumerate(board):
+        for c, cell in enumerate(row):
+            if cell == 'Red':
+                red_mask[r][c] = 1.0
+            elif cell == 'Yellow':
+                yellow_mask[r][c] = 1.0
+            elif cell != 'Empty':
+                raise KeyError(cell)
     # Create tensor shape [1,2,6,7]
     tensor = torch.tensor([red_mask, yellow_mask], dtype=torch.float32, device=device)
     return tensor.unsqueeze(0)
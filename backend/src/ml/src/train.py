@@ -7,7 +7,7 @@ import logging
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import TensorDataset, DataLoader, random_split
+from torch.utils.data import TensorDataset, DataLoader
 from tensorboardX import SummaryWriter
 
 from policy_net import Connect4PolicyNet
@@ -88,7 +88,8 @@ def load_data(data_path: str) -> TensorDataset:
         boards.append(flat)
         moves.append(move)
 
-    X = torch.tensor(boards, dtype=torch.float32)
+    # Stored pre-shaped as (N, 2, 6, 7) so batches need no per-step reshape
+    X = torch.tensor(boards, dtype=torch.float32).view(-1, 2, 6, 7)
     y = torch.tensor(moves, dtype=torch.long)
     return TensorDataset(X, y)
 
@@ -99,10 +100,23 @@ def load_data(data_path: str) -> TensorDataset:
 def train(dataset, model, criterion, optimizer, scheduler, device, config):
     val_size = int(len(dataset) * config.val_split)
     train_size = len(dataset) - val_size
-    train_ds, val_ds = random_split(dataset, [train_size, val_size])
 
-    train_loader = DataLoader(train_ds, batch_size=config.batch_size, shuffle=True)
-    val_loader = DataLoader(val_ds, batch_size=config.batch_size)
+    # Materialize both splits as contiguous tensors instead of random_split
+    # Subsets, so batches are slices rather than per-sample gathers
+    X, y = dataset.tensors
+    perm = torch.randperm(len(dataset))
+    train_idx, val_idx = perm[:train_size], perm[train_size:]
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_val, y_val = X[val_idx], y[val_idx]
+    train_ds = TensorDataset(X_train, y_train)
+    val_ds = TensorDataset(X_val, y_val)
+
+    # Collated batches land in pinned memory so the copies below can overlap
+    pin = device.type == "cuda"
+    train_loader = DataLoader(
+        train_ds, batch_size=config.batch_size, shuffle=True, pin_memory=pin
+    )
+    val_loader = DataLoader(val_ds, batch_size=config.batch_size, pin_memory=pin)
 
     writer = SummaryWriter(log_dir=config.log_dir)
     best_val_loss = float("inf")
@@ -118,9 +132,10 @@ def train(dataset, model, criterion, optimizer, scheduler, device, config):
         model.train()
         total_loss = 0.0
         for batch_idx, (xb, yb) in enumerate(train_loader, 1):
-            xb, yb = xb.to(device), yb.to(device)
-            optimizer.zero_grad()
-            logits = model(xb.view(xb.size(0), 2, 6, 7))
+            xb = xb.to(device, non_blocking=True)
+            yb = yb.to(device, non_blocking=True)
+            optimizer.zero_grad(set_to_none=True)
+            logits = model(xb)
             loss = criterion(logits, yb)
             loss.backward()
             optimizer.step()
@@ -138,8 +153,9 @@ def train(dataset, model, criterion, optimizer, scheduler, device, config):
         val_loss, correct = 0.0, 0
         with torch.no_grad():
             for xb, yb in val_loader:
-                xb, yb = xb.to(device), yb.to(device)
-                logits = model(xb.view(xb.size(0), 2, 6, 7))
+                xb = xb.to(device, non_blocking=True)
+                yb = yb.to(device, non_blocking=True)
+                logits = model(xb)
                 loss = criterion(logits, yb)
                 val_loss += loss.item() * xb.size(0)
                 preds = logits.argmax(dim=1)
@@ -210,7 +226,7 @@ def main():
 
     model = Connect4PolicyNet().to(device)
     criterion = nn.CrossEntropyLoss()
-    optimizer = optim.Adam(model.parameters(), lr=args.lr)
+    optimizer = optim.Adam(model.parameters(), lr=args.lr, fused=device.type == "cuda")
     scheduler = optim.lr_scheduler.ReduceLROnPlateau(
         optimizer, mode="min", factor=0.5, patience=args.patience, verbose=True
     )
@@ -14,7 +14,7 @@ import hashlib
 import json
 import logging
 import time
-from collections import deque
+from collections import defaultdict, deque
 from dataclasses import asdict, dataclass
 from enum import Enum
 from typing import Any, Dict, List, Optional, Set, Tuple
@@ -849,28 +849,37 @@ class AICoordinationHub:
         if not game_results:
             return {"error": "No game results to analyze"}
 
+        # Accumulate overall and per-AI totals in a single pass
+        wins = 0
+        confidence_sum = 0.0
+        per_ai = defaultdict(lambda: [0, 0, 0.0])  # games, wins, confidence
+        for r in game_results:
+            won = r.get("result") == "win"
+            confidence = r.get("confidence", 0)
+            wins += won
+            confidence_sum += confidence
+            for ai_id in set(r.get("participating_ais", [])):
+                totals = per_ai[ai_id]
+                totals[0] += 1
+                totals[1] += won
+                totals[2] += confidence
+
         analysis = {
             "total_games": len(game_results),
-            "win_rate": sum(1 for r in game_results if r.get("result") == "win")
-            / len(game_results),
-            "average_confidence": sum(r.get("confidence", 0) for r in game_results)
-            / len(game_results),
+            "win_rate": wins / len(game_results),
+            "average_confidence": confidence_sum / len(game_results),
             "ai_performance": {},
             "collaboration_effectiveness": 0.0,
         }
 
         # Analyze individual AI performance
         for ai_id in self.connected_ais:
-            ai_games = [
-                r for r in game_results if ai_id in r.get("participating_ais", [])
-            ]
-            if ai_games:
+            if ai_id in per_ai:
+                games, ai_wins, ai_confidence = per_ai[ai_id]
                 analysis["ai_performance"][ai_id] = {
-                    "games": len(ai_games),
-                    "win_rate": sum(1 for r in ai_games if r.get("result") == "win")
-                    / len(ai_games),
-                    "avg_confidence": sum(r.get("confidence", 0) for r in ai_games)
-                    / len(ai_games),
+                    "games": games,
+                    "win_rate": ai_wins / games,
+                    "avg_confidence": ai_confidence / games,
                 }
 
         return analysis
@@ -1161,14 +1170,16 @@ class AICoordinationHub:
         }
 
     # Helper methods for enhanced _assess_urgency
+    # Cell encoding used by _board_to_numpy; anything else counts as empty
+    _CELL_VALUES = {"X": 1, "O": 2}
+
     def _board_to_numpy(self, board_state: List[List[str]]) -> np.ndarray:
         """Convert board state to numpy array"""
-        mapping = {"X": 1, "O": 2, "": 0, " ": 0, None: 0}
         board = np.zeros((6, 7), dtype=int)
 
         for i, row in enumerate(board_state):
             for j, cell in enumerate(row):
-                board[i, j] = mapping.get(cell, 0)
+                board[i, j] = self._CELL_VALUES.get(cell, 0)
 
         return board
 
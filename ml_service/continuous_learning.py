@@ -12,15 +12,17 @@ Advanced continuous learning system for Connect Four AI that:
 
 import asyncio
 import gzip
+import heapq
 import json
 import logging
 import os
 import pickle
 import time
 from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
 
 import aiofiles
 import numpy as np
@@ -29,51 +31,275 @@ import torch.nn as nn
 import torch.nn.functional as F
 import websockets
 from scipy import stats
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import TensorDataset
 from websockets.server import WebSocketServerProtocol
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _json_dumps(obj: Any) -> str:
+    """Serialize a WebSocket payload, preferring orjson's C encoder"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj)
+
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+# Outcome and loss-pattern encodings used by the columnar game records
+OUTCOME_CODES = {"win": 1, "draw": 0, "loss": -1}
+PATTERN_TYPES = ("horizontal", "vertical", "diagonal", "anti-diagonal")
+NO_PATTERN = -1
+OTHER_PATTERN = len(PATTERN_TYPES)
+
+# Bitboards use the col * 7 + row layout (one spare bit per column so that
+# horizontal shifts never wrap). CELL_BITS lists each cell's bit row-major.
+CELL_BITS = np.array([c * 7 + r for r in range(6) for c in range(7)], dtype=np.uint64)
+BOARD_MASK = sum(0b111111 << (7 * c) for c in range(7))
+
+
+def encode_board(board: List[List[str]]) -> Tuple[np.uint64, np.uint64]:
+    """Pack a 6x7 'Yellow'/'Red'/'Empty' board into (yellow, red) bitboards"""
+    yellow_bb = red_bb = 0
+    for r, row in enumerate(board):
+        for c, cell in enumerate(row):
+            if cell == "Yellow":
+                yellow_bb |= 1 << (c * 7 + r)
+            elif cell == "Red":
+                red_bb |= 1 << (c * 7 + r)
+    return np.uint64(yellow_bb), np.uint64(red_bb)
+
+
+def bitboards_to_planes(yellow_bb: np.ndarray, red_bb: np.ndarray) -> np.ndarray:
+    """Unpack (B,) bitboards into (B, 2, 6, 7) float32 (AI, opponent) planes"""
+    one = np.uint64(1)
+    yellow = ((yellow_bb[:, None] >> CELL_BITS) & one).reshape(-1, 6, 7)
+    red = ((red_bb[:, None] >> CELL_BITS) & one).reshape(-1, 6, 7)
+    return np.stack([yellow, red], axis=1).astype(np.float32)
+
+
+def blocking_move_accuracy(
+    model: nn.Module, positions: List[Dict[str, Any]], batch_size: int = 256
+) -> float:
+    """Fraction of positions where the model's top move is a blocking move
+
+    Each position holds "yellow_bb", "red_bb" and "blocking_moves" (columns).
+    Batches are streamed from pinned memory and the result is synced once.
+    """
+    total = len(positions)
+    if total == 0:
+        return 0.0
+
+    device = next(model.parameters()).device
+
+    # Decode every position up front, then stream fixed-size batches
+    planes = torch.from_numpy(
+        bitboards_to_planes(
+            np.array([p["yellow_bb"] for p in positions], dtype=np.uint64),
+            np.array([p["red_bb"] for p in positions], dtype=np.uint64),
+        )
+    )
+    targets = torch.zeros(total, 7, dtype=torch.bool)
+    rows = [i for i, p in enumerate(positions) for _ in p["blocking_moves"]]
+    cols = [c for p in positions for c in p["blocking_moves"]]
+    targets[rows, cols] = True
+
+    if device.type == "cuda":
+        planes = planes.pin_memory()
+    targets = targets.to(device)
+
+    model.eval()
+    correct = torch.zeros((), dtype=torch.long, device=device)
+    with torch.inference_mode():
+        for start in range(0, total, batch_size):
+            end = start + batch_size
+            boards = planes[start:end].to(device, non_blocking=True)
+            preds = model(boards).argmax(dim=1, keepdim=True)
+            correct += targets[start:end].gather(1, preds).sum()
+
+    return correct.item() / total
+
+
+class GameBatch(NamedTuple):
+    """Columnar (struct-of-arrays) record of the AI moves from one game"""
+
+    yellow_bb: np.ndarray  # uint64 bitboards of the board before the move, (N,)
+    red_bb: np.ndarray  # uint64, shape (N,)
+    actions: np.ndarray  # int8, shape (N,)
+    outcomes: np.ndarray  # int8 in {-1, 0, 1}, shape (N,)
+    move_numbers: np.ndarray  # uint8, shape (N,)
+    total_moves: np.uint8
+    pattern_id: np.int8  # index into PATTERN_TYPES, NO_PATTERN or OTHER_PATTERN
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    @property
+    def pattern_type(self) -> Optional[str]:
+        """Loss pattern type name, if the game was a loss with a known pattern"""
+        if 0 <= self.pattern_id < len(PATTERN_TYPES):
+            return PATTERN_TYPES[self.pattern_id]
+        return None
+
+    def row_dict(self, row: int) -> Dict[str, Any]:
+        """Materialize a single move as a plain dict (for interop/serialization)"""
+        outcome = {code: name for name, code in OUTCOME_CODES.items()}
+        return {
+            "yellow_bb": int(self.yellow_bb[row]),
+            "red_bb": int(self.red_bb[row]),
+            "action": int(self.actions[row]),
+            "outcome": outcome[int(self.outcomes[row])],
+            "move_number": int(self.move_numbers[row]),
+            "total_moves": int(self.total_moves),
+        }
+
+
+# A single experience: a game record plus the row of the move within it
+ExperienceRef = Tuple[GameBatch, int]
+
+
+@dataclass
+class UpdateImprovements:
+    """Training and validation results of a single model update"""
+
+    epoch_losses: List[float] = field(default_factory=list)
+    epoch_accuracies: List[float] = field(default_factory=list)
+    horizontal_defense: float = 0.0
+    vertical_defense: float = 0.0
+    diagonal_defense: float = 0.0
+    anti_diagonal_defense: float = 0.0
+    stability: float = 0.0
+    overall_accuracy: float = 0.0
+
+    def set_defense(self, pattern: str, score: float):
+        """Record the defense score for a pattern type"""
+        setattr(self, f"{pattern.replace('-', '_')}_defense", score)
+
+
+class SumTree:
+    """Binary sum tree over leaf priorities for O(log N) proportional sampling
+
+    The leaf count is rounded up to a power of two so every leaf sits at the
+    same depth; unused leaves hold zero and are never drawn.
+    """
+
+    def __init__(self, capacity: int):
+        self.size = 1 << max(0, capacity - 1).bit_length()
+        self.depth = self.size.bit_length() - 1
+        self.tree = np.zeros(2 * self.size - 1, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[0])
+
+    def leaves(self, indices: np.ndarray) -> np.ndarray:
+        return self.tree[indices + self.size - 1]
+
+    def update(self, indices: np.ndarray, values: np.ndarray):
+        """Set leaf values and refresh their ancestors one level at a time"""
+        nodes = indices + self.size - 1
+        self.tree[nodes] = values
+        for _ in range(self.depth):
+            nodes = np.unique((nodes - 1) // 2)
+            self.tree[nodes] = self.tree[2 * nodes + 1] + self.tree[2 * nodes + 2]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Leaf index whose prefix-sum interval contains each value"""
+        nodes = np.zeros(len(values), dtype=np.int64)
+        values = values.astype(np.float64)
+        for _ in range(self.depth):
+            left = 2 * nodes + 1
+            left_sum = self.tree[left]
+            go_right = values >= left_sum
+            values = np.where(go_right, values - left_sum, values)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - (self.size - 1)
+
+
 class ExperienceBuffer:
-    """Prioritized experience replay buffer with pattern-aware sampling"""
+    """Prioritized experience replay buffer with pattern-aware sampling
+
+    Experiences are stored as ``(GameBatch, row)`` references, so each game's
+    arrays are allocated once and shared by all of its moves. ``buffer`` is a
+    ring: once full, slot ``position`` is overwritten next. Sampling weights
+    ``priority**alpha`` live in a ``SumTree`` keyed by slot, and each slot's
+    generation counts its writes so stale priority updates can be dropped.
+    """
 
     def __init__(self, capacity: int = 100000):
         self.capacity = capacity
-        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=capacity)
-        self.priorities: Deque[float] = deque(maxlen=capacity)
+        self.buffer: List[ExperienceRef] = []
+        self._priorities = np.zeros(capacity, dtype=np.float64)
+        self._tree = SumTree(capacity)
+        self._generations = np.zeros(capacity, dtype=np.int64)
+        self.max_priority = 0.0
         self.pattern_buffers = {
-            "horizontal": deque(maxlen=capacity // 4),
-            "vertical": deque(maxlen=capacity // 4),
-            "diagonal": deque(maxlen=capacity // 4),
-            "anti-diagonal": deque(maxlen=capacity // 4),
+            pattern: deque(maxlen=capacity // 4) for pattern in PATTERN_TYPES
         }
         self.position = 0
+        self.alpha = 0.6
         self.beta = 0.4
         self.beta_increment = 0.001
         self.epsilon = 0.01
 
-    def add(self, experience: Dict[str, Any], priority: float = None):
-        """Add experience with optional priority"""
+    @property
+    def priorities(self) -> np.ndarray:
+        """Priority of each stored experience, aligned with ``buffer``"""
+        return self._priorities[: len(self.buffer)]
+
+    def add(self, batch: GameBatch, priority: float = None):
+        """Add every move of a game with optional priority"""
         if priority is None:
-            priority = max(self.priorities) if self.priorities else 1.0
+            priority = self.max_priority if self.buffer else 1.0
 
-        # Add to main buffer
-        self.buffer.append(experience)
-        self.priorities.append(priority)
+        refs = [(batch, row) for row in range(len(batch))]
+
+        # Add to main buffer, overwriting the oldest slots once full
+        slots = (self.position + np.arange(len(refs))) % self.capacity
+        for slot, ref in zip(slots.tolist(), refs):
+            if slot < len(self.buffer):
+                self.buffer[slot] = ref
+            else:
+                self.buffer.append(ref)
+        self._generations[slots] += 1
+        self.position = (self.position + len(refs)) % self.capacity
+        self._set_priorities(slots, np.full(len(refs), float(priority)))
 
         # Add to pattern-specific buffer if it's a loss
-        if experience.get("outcome") == "loss" and experience.get("loss_pattern"):
-            pattern_type = experience["loss_pattern"]["type"]
-            if pattern_type in self.pattern_buffers:
-                self.pattern_buffers[pattern_type].append(experience)
+        pattern_type = batch.pattern_type
+        if pattern_type is not None:
+            self.pattern_buffers[pattern_type].extend(
+                ref for ref in refs if batch.outcomes[ref[1]] == OUTCOME_CODES["loss"]
+            )
+
+    def _set_priorities(self, slots: np.ndarray, priorities: np.ndarray):
+        if len(slots) == 0:
+            return
+        self._priorities[slots] = priorities
+        self._tree.update(slots, priorities**self.alpha)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
 
     def sample(
         self, batch_size: int, pattern_focus: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """Sample batch with optional pattern focus"""
+    ) -> Tuple[List[ExperienceRef], np.ndarray, np.ndarray]:
+        """Sample batch with optional pattern focus
+
+        Returns the experiences, their buffer slots (-1 for pattern-buffer
+        draws) and normalized importance-sampling weights.
+        """
         if pattern_focus and self.pattern_buffers[pattern_focus]:
             # 70% from pattern buffer, 30% from general buffer
             pattern_size = int(batch_size * 0.7)
@@ -82,44 +308,72 @@ class ExperienceBuffer:
             pattern_batch = self._sample_from_buffer(
                 list(self.pattern_buffers[pattern_focus]), pattern_size
             )
-            general_batch = self._prioritized_sample(general_size)
+            general_batch, indices, weights = self._prioritized_sample(general_size)
 
-            return pattern_batch + general_batch
+            return (
+                pattern_batch + general_batch,
+                np.concatenate([np.full(len(pattern_batch), -1), indices]),
+                np.concatenate([np.ones(len(pattern_batch)), weights]),
+            )
         else:
             return self._prioritized_sample(batch_size)
 
-    def _prioritized_sample(self, batch_size: int) -> List[Dict[str, Any]]:
+    def _prioritized_sample(
+        self, batch_size: int
+    ) -> Tuple[List[ExperienceRef], np.ndarray, np.ndarray]:
         """Sample using prioritized experience replay"""
-        if len(self.buffer) < batch_size:
-            return list(self.buffer)
+        size = len(self.buffer)
+        if size < batch_size:
+            return list(self.buffer), np.arange(size), np.ones(size)
 
-        # Calculate sampling probabilities
-        priorities = np.array(list(self.priorities))
-        probs = priorities**self.beta
-        probs /= probs.sum()
+        # Stratified sampling: one uniform draw per equal-width segment of the
+        # total priority mass, resolved by descending the sum tree
+        total = self._tree.total
+        u = (np.arange(batch_size) + np.random.random(batch_size)) / batch_size
+        indices = np.minimum(self._tree.find(u * total), size - 1)
 
-        # Sample indices
-        indices = np.random.choice(len(self.buffer), batch_size, p=probs)
+        # Importance-sampling weights (N * P(i))^-beta, normalized to max 1
+        probs = self._tree.leaves(indices) / total
+        weights = (size * probs) ** -self.beta
+        weights /= weights.max()
 
         # Update beta
         self.beta = min(1.0, self.beta + self.beta_increment)
 
-        return [self.buffer[i] for i in indices]
+        return [self.buffer[i] for i in indices], indices, weights
 
     def _sample_from_buffer(
-        self, buffer: List[Dict[str, Any]], size: int
-    ) -> List[Dict[str, Any]]:
+        self, buffer: List[ExperienceRef], size: int
+    ) -> List[ExperienceRef]:
         """Random sample from a specific buffer"""
         if len(buffer) <= size:
             return buffer
         indices = np.random.choice(len(buffer), size, replace=False)
         return [buffer[i] for i in indices]
 
-    def update_priorities(self, indices: List[int], priorities: List[float]):
-        """Update priorities after training"""
-        for idx, priority in zip(indices, priorities):
-            if 0 <= idx < len(self.priorities):
-                self.priorities[idx] = priority + self.epsilon
+    def generations(self, indices: np.ndarray) -> np.ndarray:
+        """Current write generation of each slot (-1 for pattern-buffer draws)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        return np.where(indices >= 0, self._generations[np.maximum(indices, 0)], -1)
+
+    def update_priorities(
+        self,
+        indices: np.ndarray,
+        priorities: np.ndarray,
+        generations: Optional[np.ndarray] = None,
+    ):
+        """Update priorities after training
+
+        When ``generations`` (from ``generations()`` at sample time) is given,
+        slots that ``add`` has overwritten since then are left untouched.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        priorities = np.asarray(priorities, dtype=np.float64)
+        valid = (indices >= 0) & (indices < len(self.buffer))
+        if generations is not None:
+            current = self._generations[np.where(valid, indices, 0)]
+            valid &= current == generations
+        self._set_priorities(indices[valid], priorities[valid] + self.epsilon)
 
 
 class ContinuousLearningPipeline:
@@ -193,10 +447,8 @@ class ContinuousLearningPipeline:
             else:
                 priority = 1.0
 
-            # Add to experience buffer with pattern info
-            for example in examples:
-                example["patterns"] = patterns
-                self.experience_buffer.add(example, priority)
+            # Add to experience buffer
+            self.experience_buffer.add(examples, priority)
 
             self.metrics["games_processed"] += 1
 
@@ -227,57 +479,60 @@ class ContinuousLearningPipeline:
         except Exception as e:
             logger.error(f"Error processing game outcome: {e}")
 
-    def _extract_training_examples(
-        self, game_data: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Extract training examples from game data"""
-        examples = []
+    def _extract_training_examples(self, game_data: Dict[str, Any]) -> GameBatch:
+        """Extract the AI moves of a game into a columnar GameBatch"""
         moves = game_data.get("moves", [])
         outcome = game_data["outcome"]
+        ai_moves = [
+            (i, move) for i, move in enumerate(moves) if move["playerId"] == "AI"
+        ]
+        n = len(ai_moves)
+
+        # Allocate all columns once per game
+        yellow_bb = np.zeros(n, dtype=np.uint64)
+        red_bb = np.zeros(n, dtype=np.uint64)
+        actions = np.empty(n, dtype=np.int8)
+        move_numbers = np.empty(n, dtype=np.uint8)
+        outcomes = np.full(n, OUTCOME_CODES.get(outcome, -1), dtype=np.int8)
+
+        for row, (i, move) in enumerate(ai_moves):
+            if (board := move.get("boardStateBefore")) is not None:
+                yellow_bb[row], red_bb[row] = encode_board(board)
+            actions[row] = move["column"]
+            move_numbers[row] = i
+
+        # Add loss pattern info if available
+        pattern_id = NO_PATTERN
+        if outcome == "loss" and (loss_pattern := game_data.get("lossPattern")):
+            pattern_type = loss_pattern.get("type")
+            pattern_id = (
+                PATTERN_TYPES.index(pattern_type)
+                if pattern_type in PATTERN_TYPES
+                else OTHER_PATTERN
+            )
 
-        # Process each move
-        for i, move in enumerate(moves):
-            if move["playerId"] == "AI":
-                # Create training example
-                example = {
-                    "board_before": move.get("boardStateBefore"),
-                    "board_after": move.get("boardStateAfter"),
-                    "action": move["column"],
-                    "outcome": outcome,
-                    "move_number": i,
-                    "total_moves": len(moves),
-                    "game_phase": self._determine_game_phase(i, len(moves)),
-                    "timestamp": move["timestamp"],
-                }
-
-                # Add loss pattern info if available
-                if outcome == "loss" and game_data.get("lossPattern"):
-                    example["loss_pattern"] = game_data["lossPattern"]
-
-                examples.append(example)
-
-        return examples
-
-    def _determine_game_phase(self, move_num: int, total_moves: int) -> str:
-        """Determine game phase (opening/middle/endgame)"""
-        if move_num < 8:
-            return "opening"
-        elif move_num < total_moves - 10:
-            return "middle"
-        else:
-            return "endgame"
+        return GameBatch(
+            yellow_bb=yellow_bb,
+            red_bb=red_bb,
+            actions=actions,
+            outcomes=outcomes,
+            move_numbers=move_numbers,
+            total_moves=np.uint8(len(moves)),
+            pattern_id=np.int8(pattern_id),
+        )
 
     async def _analyze_loss_pattern(
-        self, loss_pattern: Dict[str, Any], examples: List[Dict[str, Any]]
+        self, loss_pattern: Dict[str, Any], examples: GameBatch
     ):
         """Analyze loss pattern for targeted learning"""
         pattern_type = loss_pattern["type"]
+        last_rows = range(max(0, len(examples) - 5), len(examples))  # Last 5 moves
 
         # Store pattern for analysis
         self.loss_patterns[pattern_type].append(
             {
                 "pattern": loss_pattern,
-                "examples": examples[-5:],  # Last 5 moves
+                "examples": [(examples, row) for row in last_rows],
                 "timestamp": datetime.now(),
             }
         )
@@ -347,30 +602,49 @@ class ContinuousLearningPipeline:
 
         return True
 
+    def _update_win_rate(self, outcome: str):
+        """Track the win rate as an exponential moving average over games"""
+        won = 1.0 if outcome == "win" else 0.0
+        self.metrics["current_win_rate"] = (
+            0.99 * self.metrics["current_win_rate"] + 0.01 * won
+        )
+
+    def _determine_pattern_focus(self) -> Optional[str]:
+        """Pattern type with the most recorded losses, if any"""
+        counts = {
+            pattern: len(self.loss_patterns[pattern])
+            for pattern in PATTERN_TYPES
+            if self.loss_patterns.get(pattern)
+        }
+        return max(counts, key=counts.get) if counts else None
+
     async def update_model(self, pattern_focus: Optional[str] = None):
         """Perform incremental model update"""
         logger.info(f"Starting model update (version {self.model_version})")
 
         try:
             # Sample training batch
-            batch = self.experience_buffer.sample(
+            batch, indices, weights = self.experience_buffer.sample(
                 self.batch_size * 10,  # Larger batch for update
                 pattern_focus=pattern_focus,
             )
+            # Slots may be overwritten by add() while the update awaits
+            generations = self.experience_buffer.generations(indices)
 
             # Prepare training data
-            train_loader = self._prepare_training_data(batch)
+            train_data = self._prepare_training_data(batch, weights)
 
             # Save current model as backup
             await self._backup_current_model()
 
             # Fine-tune model
-            improvements = await self._fine_tune_model(train_loader, pattern_focus)
+            improvements = await self._fine_tune_model(train_data, pattern_focus)
 
             # Validate improvement
             if await self._validate_improvement(improvements):
                 # Deploy updated model
                 await self._deploy_updated_model()
+                self._refresh_priorities(train_data, indices, generations)
 
                 # Update metrics
                 self.metrics["model_updates"] += 1
@@ -383,7 +657,7 @@ class ContinuousLearningPipeline:
                         "type": "model_updated",
                         "data": {
                             "version": f"v{self.model_version}",
-                            "improvements": improvements,
+                            "improvements": asdict(improvements),
                             "timestamp": time.time(),
                         },
                     }
@@ -401,101 +675,108 @@ class ContinuousLearningPipeline:
             logger.error(f"Error during model update: {e}")
             await self._rollback_model()
 
-    def _prepare_training_data(self, batch: List[Dict[str, Any]]) -> DataLoader:
+    def _prepare_training_data(
+        self, batch: List[ExperienceRef], weights: Optional[np.ndarray] = None
+    ) -> TensorDataset:
         """Prepare data for training"""
-        # Convert to tensors
-        boards = []
-        actions = []
-        rewards = []
-
-        for example in batch:
-            # Convert board to tensor
-            board_tensor = self._board_to_tensor(example["board_before"])
-            boards.append(board_tensor)
-
-            # Action
-            actions.append(example["action"])
-
-            # Calculate reward based on outcome
-            reward = self._calculate_reward(example)
-            rewards.append(reward)
-
-        # Create dataset
-        dataset = Connect4Dataset(boards, actions, rewards)
-
-        return DataLoader(dataset, batch_size=self.batch_size, shuffle=True)
+        # Gather bitboards and unpack them into planes in one vectorized pass
+        yellow_bb = np.array([game.yellow_bb[row] for game, row in batch])
+        red_bb = np.array([game.red_bb[row] for game, row in batch])
+
+        actions = [int(game.actions[row]) for game, row in batch]
+        rewards = [self._calculate_reward(game, row) for game, row in batch]
+        if weights is None:
+            weights = np.ones(len(batch))
+
+        # Whole sample fits in memory as four tensors; no per-row collation
+        return TensorDataset(
+            self._boards_to_tensor(yellow_bb, red_bb),
+            torch.tensor(actions, dtype=torch.long),
+            torch.tensor(rewards, dtype=torch.float32),
+            torch.as_tensor(weights, dtype=torch.float32),
+        )
 
     def _board_to_tensor(self, board: List[List[str]]) -> torch.Tensor:
         """Convert board to tensor representation"""
-        # Create 2-channel tensor (player, opponent)
-        tensor = torch.zeros(2, 6, 7)
+        yellow_bb, red_bb = encode_board(board)
+        return self._boards_to_tensor(np.array([yellow_bb]), np.array([red_bb]))[0]
 
-        for r in range(6):
-            for c in range(7):
-                if board[r][c] == "Yellow":  # AI
-                    tensor[0, r, c] = 1
-                elif board[r][c] == "Red":  # Human
-                    tensor[1, r, c] = 1
-
-        return tensor
+    def _boards_to_tensor(
+        self, yellow_bb: np.ndarray, red_bb: np.ndarray
+    ) -> torch.Tensor:
+        """Convert (B,) bitboard arrays to a (B, 2, 6, 7) tensor (AI, opponent)"""
+        return torch.from_numpy(bitboards_to_planes(yellow_bb, red_bb))
 
-    def _calculate_reward(self, example: Dict[str, Any]) -> float:
+    def _calculate_reward(self, game: GameBatch, row: int) -> float:
         """Calculate reward for training"""
-        outcome = example["outcome"]
-        move_number = example["move_number"]
-        total_moves = example["total_moves"]
+        outcome = int(game.outcomes[row])
+        move_number = int(game.move_numbers[row])
+        total_moves = int(game.total_moves)
 
-        # Base reward
-        if outcome == "win":
-            reward = 1.0
-        elif outcome == "draw":
-            reward = 0.0
-        else:  # loss
-            reward = -1.0
+        # Base reward (win=1, draw=0, loss=-1)
+        reward = float(outcome)
 
         # Adjust based on move position (discount earlier moves)
         position_factor = (move_number + 1) / total_moves
         reward *= 0.5 + 0.5 * position_factor
 
         # Boost negative reward for critical mistakes
-        if outcome == "loss" and example.get("loss_pattern"):
+        if outcome == OUTCOME_CODES["loss"] and game.pattern_id != NO_PATTERN:
             if move_number >= total_moves - 5:  # Last 5 moves
                 reward *= 2.0  # Double negative reward
 
         return reward
 
     async def _fine_tune_model(
-        self, train_loader: DataLoader, pattern_focus: Optional[str]
-    ) -> Dict[str, float]:
+        self, train_data: TensorDataset, pattern_focus: Optional[str]
+    ) -> UpdateImprovements:
         """Fine-tune the model with adaptive learning"""
         model = self.model_manager.models["standard"]
         model.train()
+        device = next(model.parameters()).device
+
+        # Move the full training sample to the device once
+        all_boards, all_actions, all_rewards, all_weights = (
+            t.to(device) for t in train_data.tensors
+        )
+        num_samples = all_actions.size(0)
+        num_batches = -(-num_samples // self.batch_size)
 
         # Get adaptive learning rate
         current_lr = self.learning_scheduler.get_optimal_lr()
         optimizer = torch.optim.Adam(model.parameters(), lr=current_lr)
 
-        improvements = defaultdict(float)
+        improvements = UpdateImprovements()
         best_loss = float("inf")
 
         # Training loop with early stopping
         for epoch in range(10):  # More epochs with early stopping
-            total_loss = 0
-            correct_predictions = 0
+            # Accumulate on device; synchronize with the host once per epoch
+            loss_sum = torch.zeros((), device=device)
+            correct_predictions = torch.zeros((), dtype=torch.long, device=device)
             total_predictions = 0
 
-            for batch_boards, batch_actions, batch_rewards in train_loader:
+            # Shuffle with an on-device permutation and slice batches by index
+            perm = torch.randperm(num_samples, device=device)
+            for start in range(0, num_samples, self.batch_size):
+                idx = perm[start : start + self.batch_size]
+                batch_boards = all_boards[idx]
+                batch_actions = all_actions[idx]
+                batch_rewards = all_rewards[idx]
+                batch_weights = all_weights[idx]
                 optimizer.zero_grad()
 
                 # Forward pass
                 outputs = model(batch_boards)
 
                 # Calculate loss
-                loss = self._calculate_loss(outputs, batch_actions, batch_rewards)
+                loss = self._calculate_loss(
+                    outputs, batch_actions, batch_rewards, batch_weights
+                ).mean()
 
                 # Track accuracy
                 predictions = outputs.argmax(dim=1)
-                correct_predictions += (predictions == batch_actions).sum().item()
+                correct_predictions += (predictions == batch_actions).sum()
                 total_predictions += batch_actions.size(0)
 
                 # Backward pass
@@ -506,12 +787,12 @@ class ContinuousLearningPipeline:
 
                 optimizer.step()
 
-                total_loss += loss.item()
+                loss_sum += loss.detach()
 
-            avg_loss = total_loss / len(train_loader)
-            accuracy = correct_predictions / total_predictions
-            improvements[f"epoch_{epoch}_loss"] = avg_loss
-            improvements[f"epoch_{epoch}_accuracy"] = accuracy
+            avg_loss = (loss_sum / num_batches).item()
+            accuracy = correct_predictions.item() / total_predictions
+            improvements.epoch_losses.append(avg_loss)
+            improvements.epoch_accuracies.append(accuracy)
 
             # Update learning rate
             new_lr = self.learning_scheduler.update(accuracy, avg_loss)
@@ -531,40 +812,66 @@ class ContinuousLearningPipeline:
         # Calculate pattern-specific improvements
         if pattern_focus:
             pattern_improvement = await self._test_pattern_defense(pattern_focus)
-            improvements[f"{pattern_focus}_defense"] = pattern_improvement
+            improvements.set_defense(pattern_focus, pattern_improvement)
             self.pattern_improvements[pattern_focus] = pattern_improvement
         else:
             # Test all patterns
-            for pattern in ["horizontal", "vertical", "diagonal", "anti-diagonal"]:
+            for pattern in PATTERN_TYPES:
                 improvement = await self._test_pattern_defense(pattern)
-                improvements[f"{pattern}_defense"] = improvement
+                improvements.set_defense(pattern, improvement)
                 self.pattern_improvements[pattern] = improvement
 
         # Test stability
         stability_score = await self._test_model_stability()
-        improvements["stability"] = stability_score
+        improvements.stability = stability_score
 
         # Update convergence score
         self.metrics["convergence_score"] = self._calculate_convergence(improvements)
 
-        # Overall improvement
-        improvements["overall_accuracy"] = sum(
-            v for k, v in improvements.items() if "accuracy" in k
-        ) / sum(1 for k in improvements if "accuracy" in k)
+        # Overall defense accuracy
+        improvements.overall_accuracy = (
+            improvements.horizontal_defense
+            + improvements.vertical_defense
+            + improvements.diagonal_defense
+        ) / 3
 
-        return dict(improvements)
+        return improvements
 
     def _calculate_loss(
-        self, outputs: torch.Tensor, actions: torch.Tensor, rewards: torch.Tensor
+        self,
+        outputs: torch.Tensor,
+        actions: torch.Tensor,
+        rewards: torch.Tensor,
+        weights: torch.Tensor,
     ) -> torch.Tensor:
-        """Calculate custom loss function"""
-        # Policy loss (cross-entropy)
-        policy_loss = F.cross_entropy(outputs, actions, reduction="none")
+        """Calculate the per-sample custom loss"""
+        # Log-probability of the action actually played
+        log_probs = F.log_softmax(outputs, dim=1)
+        action_log_probs = log_probs.gather(1, actions.unsqueeze(1)).squeeze(1)
 
-        # Weight by rewards (positive for good moves, negative for bad)
-        weighted_loss = policy_loss * (-rewards)  # Negative because we minimize loss
+        # REINFORCE: raise log-prob of rewarded moves, lower it for punished ones;
+        # importance-sampling weights undo the prioritized-replay sampling bias
+        return -(weights * rewards * action_log_probs)
 
-        return weighted_loss.mean()
+    def _refresh_priorities(
+        self, train_data: TensorDataset, indices: np.ndarray, generations: np.ndarray
+    ):
+        """Re-prioritize sampled experiences by the new model's surprise
+
+        Uses the per-sample cross-entropy of the played move, which unlike the
+        reward-scaled REINFORCE loss stays informative for draws and other
+        zero-reward moves.
+        """
+        model = self.model_manager.models["standard"]
+        device = next(model.parameters()).device
+        boards, actions = (t.to(device) for t in train_data.tensors[:2])
+
+        model.eval()
+        with torch.inference_mode():
+            losses = F.cross_entropy(model(boards), actions, reduction="none")
+        self.experience_buffer.update_priorities(
+            indices, losses.cpu().numpy(), generations
+        )
 
     async def _test_pattern_defense(self, pattern: str) -> float:
         """Test model's defense against specific pattern"""
@@ -574,25 +881,8 @@ class ContinuousLearningPipeline:
         if not test_positions:
             return 0.5
 
-        correct = 0
-        total = len(test_positions)
-
         model = self.model_manager.models["standard"]
-        model.eval()
-
-        with torch.no_grad():
-            for position in test_positions:
-                board_tensor = self._board_to_tensor(position["board"])
-                output = model(board_tensor.unsqueeze(0))
-
-                # Get predicted move
-                predicted_move = output.argmax(dim=1).item()
-
-                # Check if it blocks the threat
-                if predicted_move in position["blocking_moves"]:
-                    correct += 1
-
-        return correct / total
+        return blocking_move_accuracy(model, test_positions)
 
     def _get_pattern_test_positions(self, pattern: str) -> List[Dict[str, Any]]:
         """Get test positions for pattern defense"""
@@ -601,26 +891,24 @@ class ContinuousLearningPipeline:
         positions = []
 
         for loss_data in self.loss_patterns[pattern][-10:]:
-            for example in loss_data["examples"]:
-                if "board_before" in example:
-                    positions.append(
-                        {
-                            "board": example["board_before"],
-                            "blocking_moves": [
-                                pos["column"]
-                                for pos in loss_data["pattern"].get(
-                                    "criticalPositions", []
-                                )
-                            ],
-                        }
-                    )
+            for game, row in loss_data["examples"]:
+                positions.append(
+                    {
+                        "yellow_bb": game.yellow_bb[row],
+                        "red_bb": game.red_bb[row],
+                        "blocking_moves": [
+                            pos["column"]
+                            for pos in loss_data["pattern"].get("criticalPositions", [])
+                        ],
+                    }
+                )
 
         return positions
 
-    async def _validate_improvement(self, improvements: Dict[str, float]) -> bool:
+    async def _validate_improvement(self, improvements: UpdateImprovements) -> bool:
         """Validate that model hasn't degraded"""
         # Check overall improvement
-        if improvements.get("overall_accuracy", 0) < -0.1:
+        if improvements.overall_accuracy < -0.1:
             return False
 
         # Check catastrophic forgetting on basic positions
@@ -630,11 +918,13 @@ class ContinuousLearningPipeline:
             return False
 
         # Check pattern defense improvements
-        for pattern in ["horizontal", "vertical", "diagonal"]:
-            if improvements.get(f"{pattern}_defense", 0) < 0.3:
-                logger.warning(
-                    f"Poor {pattern} defense: {improvements.get(f'{pattern}_defense', 0)}"
-                )
+        for pattern, defense in (
+            ("horizontal", improvements.horizontal_defense),
+            ("vertical", improvements.vertical_defense),
+            ("diagonal", improvements.diagonal_defense),
+        ):
+            if defense < 0.3:
+                logger.warning(f"Poor {pattern} defense: {defense}")
                 # Don't reject, but log concern
 
         return True
@@ -668,20 +958,39 @@ class ContinuousLearningPipeline:
             },
         ]
 
-        correct = 0
         model = self.model_manager.models["standard"]
         model.eval()
+        device = next(model.parameters()).device
 
-        with torch.no_grad():
-            for test in basic_tests:
-                board_tensor = self._board_to_tensor(test["board"])
-                output = model(board_tensor.unsqueeze(0))
-                predicted_move = output.argmax(dim=1).item()
+        boards = torch.stack([self._board_to_tensor(t["board"]) for t in basic_tests])
+        expected = torch.tensor([t["correct_move"] for t in basic_tests])
 
-                if predicted_move == test["correct_move"]:
-                    correct += 1
+        with torch.inference_mode():
+            preds = model(boards.to(device)).argmax(dim=1).cpu()
 
-        return correct / len(basic_tests)
+        return (preds == expected).sum().item() / len(basic_tests)
+
+    async def _test_model_stability(self) -> float:
+        """Check recent loss positions for forgetting (1.0 stable, 0.0 not)"""
+        test_set = [
+            position
+            for pattern in PATTERN_TYPES
+            for position in self._get_pattern_test_positions(pattern)
+        ]
+        if not test_set:
+            return 1.0
+
+        model = self.model_manager.models["standard"]
+        stable = await self.stability_monitor.check_stability(model, test_set)
+        return 1.0 if stable else 0.0
+
+    def _calculate_convergence(self, improvements: UpdateImprovements) -> float:
+        """Score in (0, 1] that approaches 1 as the last epoch losses flatten"""
+        recent = np.array(improvements.epoch_losses[-3:])
+        if len(recent) < 2:
+            return 0.0
+        spread = recent.std() / (abs(recent.mean()) + 1e-8)
+        return float(1.0 / (1.0 + spread))
 
     async def _backup_current_model(self):
         """Enhanced backup with compression and metadata"""
@@ -689,7 +998,7 @@ class ContinuousLearningPipeline:
             model = self.model_manager.models["standard"]
             backup_data = {
                 "version": self.model_version,
-                "state_dict": model.state_dict().copy(),
+                "state_dict": self._snapshot_state_dict(model),
                 "timestamp": datetime.now(),
                 "metrics": dict(self.metrics),
                 "pattern_improvements": dict(self.pattern_improvements),
@@ -730,6 +1039,36 @@ class ContinuousLearningPipeline:
         except Exception as e:
             logger.error(f"Error backing up model: {e}")
 
+    async def _cleanup_old_backups(self, backup_dir: Path, keep_last: int = 20):
+        """Clean up old model backups"""
+        try:
+            backups = {b: b.stat().st_mtime for b in backup_dir.glob("model_v*.pkl.gz")}
+            if len(backups) <= keep_last:
+                return
+
+            # Bounded heap for the newest keep_last instead of sorting them all
+            keep = set(heapq.nlargest(keep_last, backups, key=backups.get))
+            for backup in backups.keys() - keep:
+                backup.unlink()
+                logger.info(f"Deleted old backup: {backup.name}")
+
+        except Exception as e:
+            logger.error(f"Error cleaning up backups: {e}")
+
+    def _snapshot_state_dict(self, model: nn.Module) -> Dict[str, torch.Tensor]:
+        """Copy the model's state into (pinned, when CUDA is available) CPU memory"""
+        pin = torch.cuda.is_available()
+        state = model.state_dict()
+        cpu_state = {
+            k: torch.empty_like(v, device="cpu", pin_memory=pin)
+            for k, v in state.items()
+        }
+        for k, v in state.items():
+            cpu_state[k].copy_(v, non_blocking=True)
+        if pin:
+            torch.cuda.synchronize()
+        return cpu_state
+
     async def _deploy_updated_model(self):
         """Deploy the updated model"""
         # Model is already updated in-place
@@ -740,15 +1079,15 @@ class ContinuousLearningPipeline:
         """Rollback to previous model version"""
         if self.model_history:
             previous = self.model_history[-1]
-            self.model_manager.models["standard"].load_state_dict(
-                previous["state_dict"]
-            )
+            model = self.model_manager.models["standard"]
+            for k, v in model.state_dict().items():
+                v.copy_(previous["state_dict"][k], non_blocking=True)
             logger.info(f"Rolled back to model version {previous['version']}")
 
     async def _broadcast_update(self, message: Dict[str, Any]):
         """Broadcast update to all WebSocket clients"""
         if self.ws_clients:
-            message_json = json.dumps(message)
+            message_json = _json_dumps(message)
             disconnected = set()
 
             for client in self.ws_clients:
@@ -770,7 +1109,7 @@ class ContinuousLearningPipeline:
         try:
             # Send initial status
             await websocket.send(
-                json.dumps(
+                _json_dumps(
                     {
                         "type": "connection_established",
                         "data": {
@@ -783,7 +1122,7 @@ class ContinuousLearningPipeline:
 
             # Handle incoming messages
             async for message in websocket:
-                await self._handle_ws_message(websocket, json.loads(message))
+                await self._handle_ws_message(websocket, _json_loads(message))
 
         except websockets.exceptions.ConnectionClosed:
             pass
@@ -812,7 +1151,7 @@ class ContinuousLearningPipeline:
                     message.get("pattern"), message.get("board")
                 ),
             }
-            await websocket.send(json.dumps(response))
+            await websocket.send(_json_dumps(response))
 
         elif msg_type == "check_model_updates":
             # Force model update check
@@ -822,7 +1161,7 @@ class ContinuousLearningPipeline:
         elif msg_type == "get_metrics":
             # Send current metrics
             await websocket.send(
-                json.dumps({"type": "metrics_update", "data": dict(self.metrics)})
+                _json_dumps({"type": "metrics_update", "data": dict(self.metrics)})
             )
 
         elif msg_type == "opponent_adaptation":
@@ -833,7 +1172,7 @@ class ContinuousLearningPipeline:
             strategy = self.meta_learner.adapt_strategy(opponent_profile, game_history)
 
             await websocket.send(
-                json.dumps(
+                _json_dumps(
                     {
                         "type": "strategy_update",
                         "requestId": message.get("requestId"),
@@ -847,7 +1186,7 @@ class ContinuousLearningPipeline:
             patterns = self.pattern_analyzer.pattern_database
 
             await websocket.send(
-                json.dumps(
+                _json_dumps(
                     {
                         "type": "pattern_analysis_response",
                         "requestId": message.get("requestId"),
@@ -862,7 +1201,7 @@ class ContinuousLearningPipeline:
             if self.model_history:
                 await self._rollback_model()
                 await websocket.send(
-                    json.dumps(
+                    _json_dumps(
                         {
                             "type": "rollback_complete",
                             "requestId": message.get("requestId"),
@@ -891,45 +1230,21 @@ class ContinuousLearningPipeline:
 
         # Simple heuristic for now
         if pattern == "horizontal":
-            # Check each row for potential horizontal threats
-            for row in range(6):
-                consecutive = 0
-                for col in range(7):
-                    if board[row][col] == "Red":
-                        consecutive += 1
-                        if consecutive >= 2:
-                            # Check adjacent columns
-                            if col + 1 < 7 and board[row][col + 1] == "Empty":
-                                critical.append(col + 1)
-                            if (
-                                col - consecutive >= 0
-                                and board[row][col - consecutive] == "Empty"
-                            ):
-                                critical.append(col - consecutive)
-                    else:
-                        consecutive = 0
+            # Empty cells flanking a horizontal run of two or more Red discs
+            yellow_bb, red_bb = (int(bb) for bb in encode_board(board))
+            empty = BOARD_MASK & ~(yellow_bb | red_bb)
+            two_in_a_row = red_bb & (red_bb >> 7)
+            threats = ((two_in_a_row << 14) | (two_in_a_row >> 7)) & empty
+
+            while threats:
+                bit = threats & -threats
+                critical.append((bit.bit_length() - 1) // 7)
+                threats ^= bit
 
         # Remove duplicates and return top 3
         return list(set(critical))[:3]
 
 
-class Connect4Dataset(Dataset):
-    """PyTorch dataset for Connect Four training data"""
-
-    def __init__(
-        self, boards: List[torch.Tensor], actions: List[int], rewards: List[float]
-    ):
-        self.boards = boards
-        self.actions = torch.tensor(actions, dtype=torch.long)
-        self.rewards = torch.tensor(rewards, dtype=torch.float32)
-
-    def __len__(self):
-        return len(self.boards)
-
-    def __getitem__(self, idx):
-        return self.boards[idx], self.actions[idx], self.rewards[idx]
-
-
 class LearningStabilityMonitor:
     """Monitor learning stability and prevent catastrophic forgetting"""
 
@@ -965,40 +1280,15 @@ class LearningStabilityMonitor:
 
         return True
 
-    async def _evaluate_model(self, model, test_set: List[Dict[str, Any]]) -> float:
-        """Evaluate model performance"""
-        correct = 0
-        total = len(test_set)
-
-        model.eval()
-        with torch.no_grad():
-            for test in test_set:
-                # Implementation depends on test format
-                # This is a placeholder
-                correct += 1 if self._test_position(model, test) else 0
-
-        return correct / total if total > 0 else 0
-
-    def _test_position(self, model, test: Dict[str, Any]) -> bool:
-        """Test model on a single position"""
-        # Placeholder - implement based on test format
-        return True
-
-    async def _cleanup_old_backups(self, backup_dir: Path, keep_last: int = 20):
-        """Clean up old model backups"""
-        try:
-            backups = sorted(
-                backup_dir.glob("model_v*.pkl.gz"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True,
-            )
-
-            for backup in backups[keep_last:]:
-                backup.unlink()
-                logger.info(f"Deleted old backup: {backup.name}")
+    async def _evaluate_model(
+        self, model, test_set: List[Dict[str, Any]], batch_size: int = 256
+    ) -> float:
+        """Evaluate model performance on bitboard test positions
 
-        except Exception as e:
-            logger.error(f"Error cleaning up backups: {e}")
+        Each test holds "yellow_bb", "red_bb" and "blocking_moves"; the model
+        is correct when its top move is one of the blocking moves.
+        """
+        return blocking_move_accuracy(model, test_set, batch_size)
 
 
 class AdaptiveLearningScheduler:
@@ -282,26 +282,15 @@ class EnhancedInferenceEngine:
 
     def _board_to_tensor(self, board: List[List[str]]) -> torch.Tensor:
         """Convert board to tensor format"""
-        # Convert string board to numeric
-        numeric_board = []
-        for row in board:
-            numeric_row = []
-            for cell in row:
-                if cell == "Empty":
-                    numeric_row.append(0)
-                elif cell == "Red":
-                    numeric_row.append(1)
+        # Fill both player channels in one pass (unknown cells stay empty)
+        red_channel = [[0] * len(row) for row in board]
+        yellow_channel = [[0] * len(row) for row in board]
+        for r, row in enumerate(board):
+            for c, cell in enumerate(row):
+                if cell == "Red":
+                    red_channel[r][c] = 1
                 elif cell == "Yellow":
-                    numeric_row.append(-1)
-                else:
-                    numeric_row.append(0)
-            numeric_board.append(numeric_row)
-
-        # Create player channels
-        red_channel = [[1 if cell == 1 else 0 for cell in row] for row in numeric_board]
-        yellow_channel = [
-            [1 if cell == -1 else 0 for cell in row] for row in numeric_board
-        ]
+                    yellow_channel[r][c] = 1
 
         tensor = torch.tensor(
             [red_channel, yellow_channel], dtype=torch.float32, device=self.device
@@ -243,9 +243,12 @@ async def upgrade_to_difficulty_aware_learning(
     if hasattr(existing_pipeline, "experience_buffer"):
         logger.info("Transferring existing experiences to difficulty-aware buffer...")
 
-        for experience in existing_pipeline.experience_buffer.buffer:
+        experience_buffer = existing_pipeline.experience_buffer
+        for (game, row), priority in zip(
+            experience_buffer.buffer, experience_buffer.priorities
+        ):
             integrated_pipeline.difficulty_buffer.add_experience(
-                experience, experience.get("priority", 1.0)
+                game.row_dict(row), priority
             )
 
     # Transfer metrics
@@ -7,6 +7,7 @@ for seamless data flow and real-time communication.
 """
 
 import asyncio
+import heapq
 import json
 import logging
 import os
@@ -26,6 +27,11 @@ logger = logging.getLogger(__name__)
 class IntegrationClient:
     """Client for connecting to the Integration WebSocket Gateway"""
 
+    # Outgoing events are queued and coalesced into one "batch" emit
+    EMIT_QUEUE_SIZE = 1000
+    EMIT_BATCH_SIZE = 64
+    EMIT_WINDOW_S = 0.002
+
     def __init__(
         self,
         service_name: str,
@@ -55,6 +61,14 @@ class IntegrationClient:
         # Event handlers
         self._handlers: Dict[str, Callable] = {}
 
+        # Coarse timestamp shared by outgoing events, refreshed by _tick_clock
+        self._now_iso = datetime.now().isoformat()
+        self._clock_task: Optional[asyncio.Task] = None
+
+        # Outgoing event queue, drained by _drain_emits while connected
+        self._send_queue: asyncio.Queue = asyncio.Queue(maxsize=self.EMIT_QUEUE_SIZE)
+        self._drain_task: Optional[asyncio.Task] = None
+
         # Setup default handlers
         self._setup_default_handlers()
 
@@ -111,17 +125,90 @@ class IntegrationClient:
             if "service_status_update" in self._handlers:
                 await self._handlers["service_status_update"](data)
 
+    async def _tick_clock(self):
+        """Refresh the cached event timestamp every 10 ms"""
+        while True:
+            self._now_iso = datetime.now().isoformat()
+            await asyncio.sleep(0.01)
+
+    @property
+    def timestamp(self) -> str:
+        """ISO timestamp for outgoing events (cached while connected)"""
+        if self._clock_task is None:
+            return datetime.now().isoformat()
+        return self._now_iso
+
+    async def _drain_emits(self):
+        """Send queued events, coalescing bursts into a single "batch" emit"""
+        while True:
+            batch = [await self._send_queue.get()]
+            if self.EMIT_WINDOW_S > 0:
+                await asyncio.sleep(self.EMIT_WINDOW_S)
+            try:
+                while len(batch) < self.EMIT_BATCH_SIZE:
+                    batch.append(self._send_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                pass
+            await self._send_batch(batch)
+            for _ in batch:
+                self._send_queue.task_done()
+
+    async def _send_batch(self, batch: List[Tuple[str, Any]]):
+        """Emit queued events; lone events keep their own event name"""
+        try:
+            if len(batch) == 1:
+                event, data = batch[0]
+                await self.sio.emit(event, data, namespace="/integration")
+            else:
+                await self.sio.emit(
+                    "batch",
+                    [[event, data] for event, data in batch],
+                    namespace="/integration",
+                )
+        except Exception as e:
+            logger.error(f"Failed to emit {len(batch)} event(s): {e}")
+
+    def _start_clock(self):
+        """Start the timestamp clock"""
+        if self._clock_task is None:
+            self._now_iso = datetime.now().isoformat()
+            self._clock_task = asyncio.create_task(self._tick_clock())
+
+    def _start_drainer(self):
+        """Start the emit drainer (only once the socket is connected)"""
+        if self._drain_task is None:
+            self._drain_task = asyncio.create_task(self._drain_emits())
+
+    async def _stop_background_tasks(self):
+        """Stop the timestamp clock and the emit drainer"""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+        if self._clock_task is not None:
+            self._clock_task.cancel()
+            self._clock_task = None
+
     async def connect(self):
         """Connect to the Integration Gateway"""
+        self._start_clock()
         try:
             await self.sio.connect(self.integration_url, namespaces=["/integration"])
+            self._start_drainer()
             logger.info(f"🌐 Connecting {self.service_name} to Integration Gateway...")
         except Exception as e:
             logger.error(f"Failed to connect: {e}")
+            await self._stop_background_tasks()
             raise
 
     async def disconnect(self):
         """Disconnect from the Integration Gateway"""
+        # Let the drainer flush anything still queued before the socket closes
+        if self._drain_task is not None:
+            try:
+                await asyncio.wait_for(self._send_queue.join(), timeout=1.0)
+            except asyncio.TimeoutError:
+                logger.warning("Timed out flushing queued integration events")
+        await self._stop_background_tasks()
         await self.sio.disconnect()
 
     async def register_service(self):
@@ -131,12 +218,18 @@ class IntegrationClient:
             {
                 "serviceName": self.service_name,
                 "capabilities": self.capabilities,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.timestamp,
             },
         )
 
     async def emit(self, event: str, data: Any):
         """Emit an event to the Integration Gateway"""
+        if self._drain_task is not None:
+            try:
+                self._send_queue.put_nowait((event, data))
+                return
+            except asyncio.QueueFull:
+                logger.warning(f"Emit queue full, sending {event} directly")
         try:
             await self.sio.emit(event, data, namespace="/integration")
         except Exception as e:
@@ -157,7 +250,7 @@ class IntegrationClient:
             {
                 "pattern": pattern,
                 "source": self.service_name,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.timestamp,
             },
         )
 
@@ -172,7 +265,7 @@ class IntegrationClient:
                 "version": version,
                 "metadata": metadata or {},
                 "source": self.service_name,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.timestamp,
             },
         )
 
@@ -200,7 +293,7 @@ class IntegrationClient:
                 "simulationId": simulation_id,
                 "result": result,
                 "source": self.service_name,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.timestamp,
             },
         )
 
@@ -211,7 +304,7 @@ class IntegrationClient:
             {
                 "insight": insight,
                 "source": self.service_name,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.timestamp,
             },
         )
 
@@ -850,15 +943,18 @@ class MLServiceIntegration:
         """Clean up old backups, keeping only the most recent N backups"""
         try:
             # Find all backup files
-            backup_files = []
+            backup_files = {}
             for pattern in ["*.pt.gz", "*.tar.gz"]:
-                backup_files.extend(backup_dir.glob(pattern))
+                for path in backup_dir.glob(pattern):
+                    backup_files[path] = path.stat().st_mtime
+            if len(backup_files) <= keep_count:
+                return
 
-            # Sort by modification time (newest first)
-            backup_files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+            # Keep the newest keep_count via a bounded heap rather than a full sort
+            keep = set(heapq.nlargest(keep_count, backup_files, key=backup_files.get))
 
             # Remove old backups and their metadata
-            for old_backup in backup_files[keep_count:]:
+            for old_backup in backup_files.keys() - keep:
                 # Remove backup file
                 old_backup.unlink()
 
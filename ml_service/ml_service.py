@@ -730,6 +730,9 @@ rate_limiter = RateLimiter()
 class InferenceEngine:
     """Advanced inference engine with optimization and error handling"""
 
+    # Cell encoding for string boards; unknown cells count as empty
+    CELL_VALUES = {"Empty": 0, "Red": 1, "Yellow": -1}
+
     @staticmethod
     def convert_board_to_tensor(
         board_data: Union[List[List[str]], List[List[List[float]]]],
@@ -743,17 +746,13 @@ class InferenceEngine:
                 )
             elif isinstance(board_data, list) and len(board_data) == 6:
                 # String format - convert to tensor
-                mapping = {"Empty": 0.0, "Red": 1.0, "Yellow": -1.0}
-                numeric = [
-                    [mapping.get(cell, 0.0) for cell in row] for row in board_data
-                ]
-                red_mask = [[1.0 if v == 1.0 else 0.0 for v in row] for row in numeric]
-                yellow_mask = [
-                    [1.0 if v == -1.0 else 0.0 for v in row] for row in numeric
-                ]
-                tensor = torch.tensor(
-                    [red_mask, yellow_mask], dtype=torch.float32, device=config.DEVICE
+                cell_values = InferenceEngine.CELL_VALUES
+                numeric = np.array(
+                    [[cell_values.get(cell, 0) for cell in row] for row in board_data],
+                    dtype=np.int8,
                 )
+                planes = np.stack([numeric == 1, numeric == -1]).astype(np.float32)
+                tensor = torch.from_numpy(planes).to(config.DEVICE)
             else:
                 raise ValueError(
                     f"Invalid board format: expected 6×7 or 2×6×7, got {len(board_data)}"
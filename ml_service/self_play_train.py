@@ -14,9 +14,12 @@ All settings configurable via CLI args or environment variables.
 """
 
 import argparse
+import hashlib
+import io
 import math
 import os
 import random
+import shutil
 import sys
 import time
 from concurrent.futures import ProcessPoolExecutor, as_completed
@@ -235,6 +238,27 @@ class GameState:
         t = torch.tensor([mine, theirs], dtype=torch.float32).view(1, 2, ROWS, COLS)
         return t
 
+    def to_bitboards(self, perspective: int) -> Tuple[int, int]:
+        """(my_pieces, opponent_pieces) bitboards; bit i is board cell i."""
+        mine = theirs = 0
+        for i, cell in enumerate(self.board):
+            if cell == perspective:
+                mine |= 1 << i
+            elif cell == -perspective:
+                theirs |= 1 << i
+        return mine, theirs
+
+
+# Bit shifts that unpack a row-major bitboard into its 42 cells
+CELL_SHIFTS = torch.arange(ROWS * COLS, dtype=torch.int64)
+
+
+def bitboards_to_planes(bitboards: torch.Tensor) -> torch.Tensor:
+    """Expand (B, 2) int64 bitboards into (B, 2, ROWS, COLS) float planes."""
+    shifts = CELL_SHIFTS.to(bitboards.device)
+    bits = (bitboards.unsqueeze(-1) >> shifts) & 1
+    return bits.view(-1, 2, ROWS, COLS).float()
+
 
 # ─── MCTS ─────────────────────────────────────────────────────────────────────
 
@@ -331,17 +355,12 @@ def _expand(node: Node, game: GameState, model: nn.Module, device: torch.device)
         except Exception:
             value = 0.0
 
-    # Mask and normalize
-    probs = F.softmax(logits, dim=0).numpy()
-    mask = [1.0 if c in valid else 0.0 for c in range(COLS)]
-    probs = probs * mask
-    s = probs.sum()
-    if s > 0:
-        probs /= s
-    else:
-        probs = [m / sum(mask) for m in mask]
+    # Softmax over legal moves only (illegal logits masked to -inf)
+    mask = torch.full((COLS,), float("-inf"))
+    mask[valid] = 0.0
+    probs = F.softmax(logits + mask, dim=0).tolist()
 
-    node.children = [Node(node, col, float(probs[col])) for col in valid]
+    node.children = [Node(node, col, probs[col]) for col in valid]
     return value
 
 
@@ -355,7 +374,7 @@ def _backprop(node: Node, value: float):
 
 # ─── Self-Play Worker ─────────────────────────────────────────────────────────
 
-def _self_play_worker(args: tuple) -> List[Tuple[list, list, float]]:
+def _self_play_worker(args: tuple) -> List[Tuple[Tuple[int, int], list, float]]:
     """Worker function for parallel self-play. Returns serializable data."""
     model_state, num_games, num_sims, c_puct, temperature, temp_drop, channels, num_blocks = args
 
@@ -377,8 +396,7 @@ def _self_play_worker(args: tuple) -> List[Tuple[list, list, float]]:
                 game, model, num_sims, c_puct, device,
                 add_noise=True,
             )
-            tensor_data = game.to_tensor(game.current).squeeze(0).tolist()
-            history.append((tensor_data, policy, game.current))
+            history.append((game.to_bitboards(game.current), policy, game.current))
 
             # Temperature-based move selection
             if game.moves < temp_drop and temperature > 0:
@@ -387,7 +405,7 @@ def _self_play_worker(args: tuple) -> List[Tuple[list, list, float]]:
                 adj = [p / total for p in adj]
                 col = random.choices(range(COLS), weights=adj, k=1)[0]
             else:
-                col = max(range(COLS), key=lambda c: policy[c])
+                col = policy.index(max(policy))
 
             game.drop(col)
 
@@ -396,29 +414,61 @@ def _self_play_worker(args: tuple) -> List[Tuple[list, list, float]]:
         if game.check_win():
             winner = -game.current  # current already flipped after last drop
 
-        for tensor_data, policy, player in history:
+        for bitboards, policy, player in history:
             if winner == 0:
                 outcome = 0.0
             elif winner == player:
                 outcome = 1.0
             else:
                 outcome = -1.0
-            all_data.append((tensor_data, policy, outcome))
+            all_data.append((bitboards, policy, outcome))
 
     return all_data
 
 
 # ─── Training ─────────────────────────────────────────────────────────────────
 
+class ReplayBuffer:
+    """Fixed-capacity ring buffer of (bitboards, policy, outcome) examples.
+
+    Examples live in preallocated tensors; once full, new examples overwrite
+    the oldest ones in place at the write head. Boards are kept as two int64
+    bitboards (16 bytes) and only expanded to float planes per batch.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.boards = torch.zeros(capacity, 2, dtype=torch.int64)
+        self.policies = torch.zeros(capacity, COLS)
+        self.values = torch.zeros(capacity, 1)
+        self.head = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def extend(self, data: List[Tuple[Tuple[int, int], list, float]]):
+        data = data[-self.capacity:]
+        if not data:
+            return
+
+        idx = (self.head + torch.arange(len(data))) % self.capacity
+        self.boards[idx] = torch.tensor([b for b, _, _ in data], dtype=torch.int64)
+        self.policies[idx] = torch.tensor([p for _, p, _ in data], dtype=torch.float32)
+        self.values[idx] = torch.tensor([[v] for _, _, v in data], dtype=torch.float32)
+        self.head = (self.head + len(data)) % self.capacity
+        self.size = min(self.capacity, self.size + len(data))
+
+
 def train_step(
     model: Connect4Net,
-    data: List[Tuple[list, list, float]],
+    data: ReplayBuffer,
     optimizer: torch.optim.Optimizer,
     batch_size: int,
     device: torch.device,
 ) -> Dict[str, float]:
     """Train on self-play data. Returns loss metrics."""
-    random.shuffle(data)
+    perm = torch.randperm(len(data))
     model.train()
 
     total_policy_loss = 0.0
@@ -426,13 +476,13 @@ def train_step(
     batches = 0
 
     for i in range(0, len(data), batch_size):
-        batch = data[i: i + batch_size]
-        if len(batch) < 2:
+        idx = perm[i: i + batch_size]
+        if len(idx) < 2:
             continue
 
-        boards = torch.tensor([b for b, _, _ in batch], dtype=torch.float32).to(device)
-        target_pi = torch.tensor([p for _, p, _ in batch], dtype=torch.float32).to(device)
-        target_v = torch.tensor([[v] for _, _, v in batch], dtype=torch.float32).to(device)
+        boards = bitboards_to_planes(data.boards[idx].to(device))
+        target_pi = data.policies[idx].to(device)
+        target_v = data.values[idx].to(device)
 
         policy_logits, value = model.forward_both(boards)
 
@@ -485,7 +535,7 @@ def evaluate(
         while not game.is_terminal():
             m = models[game.current]
             policy = run_mcts(game, m, num_sims, 1.5, device, add_noise=False)
-            col = max(range(COLS), key=lambda c: policy[c])
+            col = policy.index(max(policy))
             game.drop(col)
 
         if game.check_win():
@@ -552,6 +602,91 @@ def parse_args() -> argparse.Namespace:
     return p.parse_args()
 
 
+# ─── Checkpoints ──────────────────────────────────────────────────────────────
+
+# blake2b digests of checkpoint files, valid while (st_size, st_mtime_ns) holds
+_digest_cache: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _remember_digest(path: Path, digest: str):
+    _digest_cache[path.resolve()] = (_stat_key(path), digest)
+
+
+def _file_digest(path: Path) -> str:
+    """Digest of path's current bytes, re-hashed only if size or mtime changed"""
+    key = _stat_key(path)
+    cached = _digest_cache.get(path.resolve())
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _digest_cache[path.resolve()] = (key, digest)
+    return digest
+
+
+def save_checkpoint(state: dict, path: Path):
+    """Serialize a state dict atomically (temp file + rename).
+
+    Leaves path untouched when it already holds exactly these bytes.
+    """
+    buf = io.BytesIO()
+    torch.save(state, buf)
+    data = buf.getbuffer()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    key = _stat_key(path)
+    if key is not None and key[0] == len(data) and _file_digest(path) == digest:
+        return
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    _remember_digest(path, digest)
+
+
+def promote_checkpoint(src: Path, dst: Path):
+    """Copy a saved checkpoint to dst without re-serializing it.
+
+    Skips the copy when dst already holds identical bytes (sizes first, then
+    digests). Otherwise uses copy_file_range so the kernel can reflink or copy
+    in-kernel, and renames into place so readers never see a partially
+    written file.
+    """
+    dst_key = _stat_key(dst)
+    if dst_key is not None and dst_key[0] == src.stat().st_size:
+        if _file_digest(src) == _file_digest(dst):
+            return
+
+    tmp = dst.with_name(dst.name + ".tmp")
+    try:
+        with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    raise OSError("copy_file_range made no progress")
+                remaining -= copied
+    except (AttributeError, OSError):  # not Linux, or unsupported across devices
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+    cached = _digest_cache.get(src.resolve())
+    if cached is not None and cached[0] == _stat_key(src):
+        _remember_digest(dst, cached[1])
+
+
 # ─── Main ─────────────────────────────────────────────────────────────────────
 
 def main():
@@ -610,8 +745,7 @@ def main():
         optimizer, T_max=args.iterations, eta_min=args.lr * 0.1
     )
 
-    replay_buffer: List[Tuple[list, list, float]] = []
-    max_buffer = args.games * 42 * 3  # ~3 iterations of data
+    replay_buffer = ReplayBuffer(args.games * 42 * 3)  # ~3 iterations of data
     accepted_count = 0
 
     for iteration in range(1, args.iterations + 1):
@@ -652,10 +786,8 @@ def main():
         print(f" -> {len(iteration_data)} positions in {elapsed:.0f}s "
               f"({args.games / elapsed:.1f} games/sec)")
 
-        # Add to replay buffer
+        # Add to replay buffer (evicts the oldest positions once full)
         replay_buffer.extend(iteration_data)
-        if len(replay_buffer) > max_buffer:
-            replay_buffer = replay_buffer[-max_buffer:]
 
         # ── Phase 2: Training ────────────────────────────────────────────
         print(f"  Training on {len(replay_buffer)} positions...", end="", flush=True)
@@ -672,8 +804,8 @@ def main():
         # ── Phase 4: Model selection ─────────────────────────────────────
         if result["new_win_rate"] >= args.win_threshold:
             best_model.load_state_dict(model.state_dict())
-            torch.save(model.state_dict(), best_path)
-            torch.save(model.state_dict(), model_path)
+            save_checkpoint(model.state_dict(), best_path)
+            promote_checkpoint(best_path, model_path)
             accepted_count += 1
             print(f"  ACCEPTED ({accepted_count} total)")
         else:
@@ -684,13 +816,13 @@ def main():
         print(f"  Time: {total_time:.0f}s\n")
 
     # ── Save final model ─────────────────────────────────────────────────
-    torch.save(best_model.state_dict(), model_path)
-    torch.save(best_model.state_dict(), best_path)
+    save_checkpoint(best_model.state_dict(), best_path)
+    promote_checkpoint(best_path, model_path)
 
     root_models = Path(__file__).parent.parent / "models"
     if root_models.exists():
-        torch.save(best_model.state_dict(), root_models / "best_policy_net.pt")
-        torch.save(best_model.state_dict(), root_models / "current_policy_net.pt")
+        promote_checkpoint(best_path, root_models / "best_policy_net.pt")
+        promote_checkpoint(best_path, root_models / "current_policy_net.pt")
         print(f"Model saved to {root_models}/")
 
     print(f"\nDone! {accepted_count}/{args.iterations} iterations improved the model.")
@@ -9,7 +9,6 @@ for real-time model improvement during gameplay.
 
 import asyncio
 import logging
-import multiprocessing
 import os
 import sys
 import time
@@ -25,6 +24,19 @@ logger = logging.getLogger(__name__)
 sys.path.insert(0, str(Path(__file__).parent))
 
 
+def install_uvloop():
+    """Use uvloop for new asyncio event loops when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("uvloop not available, using default asyncio event loop")
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("Using uvloop event loop")
+    return True
+
+
 def start_ml_service():
     """Start the main ML service"""
     import uvicorn
@@ -39,84 +51,6 @@ def start_ml_service():
     uvicorn.run(app, host=host, port=port, reload=False, access_log=True)
 
 
-def start_continuous_learning():
-    """Start the continuous learning pipeline"""
-    import asyncio
-
-    from continuous_learning import (ContinuousLearningPipeline,
-                                     run_continuous_learning)
-
-    from ml_service import \
-      model_manager  # Import model manager from main service
-
-    logger.info("Starting continuous learning pipeline")
-
-    # Configuration for continuous learning
-    config = {
-        "buffer_capacity": 100000,
-        "learning_rate": 0.0001,
-        "batch_size": 32,
-        "update_frequency": 100,
-        "min_games": 50,
-        "validation_threshold": 0.95,
-        "catastrophic_threshold": 0.15,
-        "degradation_threshold": 0.05,
-        "improvement_threshold": 0.02,
-    }
-
-    # Create event loop and run
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-
-    try:
-        loop.run_until_complete(run_continuous_learning(model_manager, config))
-    except KeyboardInterrupt:
-        logger.info("Continuous learning pipeline shutting down")
-    finally:
-        loop.close()
-
-
-def start_learning_monitor():
-    """Start the learning stability monitor"""
-    import asyncio
-
-    from continuous_learning import ContinuousLearningPipeline
-    from learning_monitor import monitor_learning_stability
-
-    from ml_service import model_manager
-
-    logger.info("Starting learning stability monitor")
-
-    # Configuration for monitor
-    config = {
-        "catastrophic_threshold": 0.15,
-        "degradation_threshold": 0.05,
-        "improvement_threshold": 0.02,
-    }
-
-    # Create event loop and run
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-
-    # Create pipeline instance (would be shared with continuous learning in production)
-    pipeline = ContinuousLearningPipeline(model_manager, config)
-
-    try:
-        # Check if model exists first
-        if "standard" in model_manager.models:
-            loop.run_until_complete(
-                monitor_learning_stability(
-                    model_manager.models["standard"], pipeline, config
-                )
-            )
-        else:
-            logger.warning("Standard model not found, skipping learning monitor")
-    except KeyboardInterrupt:
-        logger.info("Learning monitor shutting down")
-    finally:
-        loop.close()
-
-
 async def start_integrated_service():
     """Start ML service with integrated continuous learning"""
     import uvicorn
@@ -227,9 +161,36 @@ async def start_integrated_service():
         )
         await asyncio.Future()  # Run forever
 
-    # Start both HTTP and WebSocket servers as background tasks
-    asyncio.create_task(start_cl_http())
-    asyncio.create_task(start_cl_websocket())
+    # Everything shares this event loop; keep the task handles so they are
+    # not garbage collected and can be cancelled when the server stops
+    background_tasks = [
+        asyncio.create_task(start_cl_http()),
+        asyncio.create_task(start_cl_websocket()),
+    ]
+
+    # Learning stability monitor watches the same pipeline and model in-process
+    if os.environ.get("ENABLE_LEARNING_MONITOR", "false").lower() == "true":
+        try:
+            from learning_monitor import monitor_learning_stability
+
+            if "standard" in model_manager.models:
+                monitor_config = {
+                    "catastrophic_threshold": 0.15,
+                    "degradation_threshold": 0.05,
+                    "improvement_threshold": 0.02,
+                }
+                background_tasks.append(
+                    asyncio.create_task(
+                        monitor_learning_stability(
+                            model_manager.models["standard"], pipeline, monitor_config
+                        )
+                    )
+                )
+                logger.info("Learning stability monitor started")
+            else:
+                logger.warning("Standard model not found, skipping learning monitor")
+        except Exception as e:
+            logger.warning(f"Could not start learning stability monitor: {e}")
 
     # Start coordination-learning bridge if AI coordination is available
     if os.environ.get("ENABLE_COORDINATION_BRIDGE", "true").lower() == "true":
@@ -237,7 +198,7 @@ async def start_integrated_service():
             from coordination_learning_bridge import CoordinationLearningBridge
 
             bridge = CoordinationLearningBridge()
-            asyncio.create_task(bridge.start())
+            background_tasks.append(asyncio.create_task(bridge.start()))
             logger.info("Coordination-Learning Bridge started")
         except Exception as e:
             logger.warning(f"Could not start Coordination-Learning Bridge: {e}")
@@ -248,7 +209,7 @@ async def start_integrated_service():
             from integration_client import MLServiceIntegration
 
             ml_integration = MLServiceIntegration()
-            asyncio.create_task(ml_integration.start())
+            background_tasks.append(asyncio.create_task(ml_integration.start()))
             logger.info("✅ Service Integration client started")
 
             # Register pipeline with integration for real-time updates
@@ -265,13 +226,19 @@ async def start_integrated_service():
     )
 
     server = uvicorn.Server(config)
-    await server.serve()
+    try:
+        await server.serve()
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
 
 
 def main():
     """Main entry point - starts integrated ML service with continuous learning"""
     logger.info("🚀 Starting ML Service with Continuous Learning")
 
+    install_uvloop()
     try:
         asyncio.run(start_integrated_service())
     except KeyboardInterrupt:
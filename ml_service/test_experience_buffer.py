@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the prioritized replay structures in continuous_learning
+
+Run with: python -m pytest ml_service/test_experience_buffer.py
+"""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+import torch.nn as nn
+
+from continuous_learning import (
+    NO_PATTERN,
+    ContinuousLearningPipeline,
+    ExperienceBuffer,
+    GameBatch,
+    SumTree,
+)
+
+
+class StubModelManager:
+    def __init__(self):
+        self.models = {"standard": nn.Sequential(nn.Flatten(), nn.Linear(84, 7))}
+
+
+def make_game(moves: int, seed: int = 0) -> GameBatch:
+    rng = np.random.default_rng(seed)
+    return GameBatch(
+        yellow_bb=np.zeros(moves, dtype=np.uint64),
+        red_bb=np.zeros(moves, dtype=np.uint64),
+        actions=rng.integers(0, 7, size=moves).astype(np.int8),
+        outcomes=np.zeros(moves, dtype=np.int8),
+        move_numbers=np.arange(moves, dtype=np.uint8),
+        total_moves=np.uint8(moves),
+        pattern_id=np.int8(NO_PATTERN),
+    )
+
+
+@pytest.mark.parametrize("capacity", [1, 5, 8, 37])
+def test_sum_tree_find_matches_prefix_sums(capacity):
+    rng = np.random.default_rng(capacity)
+    tree = SumTree(capacity)
+    values = rng.random(capacity) + 0.01
+    tree.update(np.arange(capacity), values)
+
+    # Overwrite a few leaves, including repeats, and keep the reference in sync
+    slots = rng.integers(0, capacity, size=capacity)
+    new_values = rng.random(capacity) + 0.01
+    tree.update(slots, new_values)
+    values[slots] = new_values
+
+    assert tree.total == pytest.approx(values.sum())
+    np.testing.assert_allclose(tree.leaves(np.arange(capacity)), values)
+
+    cumsum = np.cumsum(values)
+    queries = rng.random(1000) * cumsum[-1]
+    expected = np.searchsorted(cumsum, queries, side="right")
+    np.testing.assert_array_equal(tree.find(queries), expected)
+
+
+def test_sum_tree_never_finds_zero_leaves():
+    tree = SumTree(6)
+    tree.update(np.arange(6), np.array([0.0, 1.0, 0.0, 2.0, 0.0, 3.0]))
+    found = tree.find(np.linspace(0, tree.total, 500, endpoint=False))
+    assert set(found.tolist()) <= {1, 3, 5}
+
+
+def test_importance_weights_are_positive_and_proportional():
+    buffer = ExperienceBuffer(capacity=64)
+    buffer.add(make_game(64))
+    priorities = np.linspace(0.1, 5.0, 64)
+    buffer.update_priorities(np.arange(64), priorities)
+
+    beta = buffer.beta
+    _, indices, weights = buffer.sample(32)
+
+    assert np.all(weights > 0)
+    assert weights.max() == pytest.approx(1.0)
+
+    # w_i ∝ (N * P(i))^-beta, so w_i / w_j == (p_j / p_i)^(alpha * beta)
+    p = buffer.priorities[indices] ** buffer.alpha
+    expected = (p / p.min()) ** -beta
+    np.testing.assert_allclose(weights, expected)
+
+
+def test_update_priorities_skips_overwritten_slots():
+    buffer = ExperienceBuffer(capacity=4)
+    buffer.add(make_game(4), priority=1.0)
+    indices = np.array([0, 1, 2, 3, -1])
+    generations = buffer.generations(indices)
+
+    # Wrap around and overwrite slots 0 and 1 before the update lands
+    buffer.add(make_game(2), priority=1.0)
+    buffer.update_priorities(indices, np.full(5, 3.0), generations)
+
+    np.testing.assert_allclose(
+        buffer.priorities, [1.0, 1.0, 3.0 + buffer.epsilon, 3.0 + buffer.epsilon]
+    )
+
+
+def test_update_model_refreshes_sampled_priorities(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # model backups are written relative to cwd
+    pipeline = ContinuousLearningPipeline(
+        StubModelManager(), {"batch_size": 4, "validation_threshold": 0.0}
+    )
+    for seed in range(10):
+        pipeline.experience_buffer.add(make_game(20, seed), priority=1.0)
+    before = pipeline.experience_buffer.priorities.copy()
+
+    asyncio.run(pipeline.update_model())
+
+    assert pipeline.metrics["model_updates"] == 1
+    after = pipeline.experience_buffer.priorities
+    changed = after != before
+    assert changed.any()
+    assert np.all(after[changed] > pipeline.experience_buffer.epsilon)
+
+
+def test_backup_cleanup_keeps_newest(tmp_path):
+    pipeline = ContinuousLearningPipeline(StubModelManager(), {})
+    for i in range(25):
+        backup = tmp_path / f"model_v{i}_20260101_000000.pkl.gz"
+        backup.write_bytes(b"")
+        os.utime(backup, (i, i))
+
+    asyncio.run(pipeline._cleanup_old_backups(tmp_path, keep_last=20))
+
+    remaining = sorted(int(p.name.split("_")[1][1:]) for p in tmp_path.iterdir())
+    assert remaining == list(range(5, 25))